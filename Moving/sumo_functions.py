@@ -205,12 +205,23 @@ def add_person_request(personID, req: Request):
     req.reservation = None
     return True
 
+def find_route(from_edge, to_edge, router=None):
+    """
+    fastest route from from_edge to to_edge
+    router: Net.router.AltRouter, answers without TraCI if it knows both edges
+    """
+    if router and from_edge in router.graph.index and to_edge in router.graph.index:
+        return router.route(from_edge, to_edge)
+    return traci.simulation.findRoute(from_edge, to_edge)
+
+
 class RouteCheck:
-    def __init__(self, fromEdge, toEdge):
+    def __init__(self, fromEdge, toEdge, router=None):
         self.fromEdgeRaw = fromEdge
         self.toEdgeRaw = toEdge
         self.fromEdgeFixed = None
         self.toEdgeFixed = None
+        self.router = router
 
     def route_exists(self):
         # fix '420627369#12' --> '420627369#12' maybe causing problems
@@ -233,34 +244,48 @@ class RouteCheck:
         combinations.append((fromEdgeNoHash, toEdgeNoHash))
         # extend toEdge with hashes from 0 - 39:
         [combinations.append((fromEdgeWithHash, toEdgeNoHash + f'#{i}')) for i in range(40)]
-        stage = None
+        if self.router:
+            # edges unknown to the router are unknown to SUMO or no roads
+            # no route in the road graph: check all combinations with TraCI
+            index = self.router.graph.index
+            for combination in combinations:
+                if combination[0] in index and combination[1] in index:
+                    stage = self.router.route(combination[0], combination[1])
+                    if stage:
+                        return self.set_fixed(combination, stage)
         for combination in combinations:
             try:
-                stage = traci.simulation.findRoute(fromEdge=combination[0], toEdge=combination[1])
-                if not stage or len(stage.edges) <= 2:
-                    dlog(
-                        f"target is too close ({self.fromEdgeRaw} --> {self.toEdgeRaw} = less than 3 edges). Will not route to target")
-                    return False
-                self.fromEdgeFixed = combination[0]
-                self.toEdgeFixed = combination[1]
-                return True
+                stage = traci.simulation.findRoute(combination[0], combination[1])
+                return self.set_fixed(combination, stage)
             except exceptions.TraCIException as e:
                 logs.append(str(e))
         elog(', '.join(logs))
         return False
 
+    def set_fixed(self, combination, stage):
+        if not stage or len(stage.edges) <= 2:
+            dlog(
+                f"target is too close ({self.fromEdgeRaw} --> {self.toEdgeRaw} = less than 3 edges). Will not route to target")
+            return False
+        self.fromEdgeFixed = combination[0]
+        self.toEdgeFixed = combination[1]
+        return True
+
     def fixed_edges(self) -> Tuple[str, str]:
         if self.route_exists():
             return self.fromEdgeFixed, self.toEdgeFixed
         else:
             raise RuntimeError("No edges available")
 
-def route_to_edge(vehID: str, target_edge: str) -> bool:
+def route_to_edge(vehID: str, target_edge: str, router=None) -> bool:
     """
     generate a route to target_edge and set it for vehID
     WARNING: to_edge (from SectorEdges.xml) always must be in format 1234#y. Does not work without #y; e.g. y=0
+    router: Net.router.AltRouter to check the route without TraCI, see RouteCheck
     """
-    route_check = RouteCheck(fromEdge=traci.vehicle.getRoadID(vehID), toEdge=target_edge)
+    route_check = RouteCheck(
+        fromEdge=traci.vehicle.getRoadID(vehID), toEdge=target_edge, router=router
+    )
     validated_target_edge = None
     try:
         validated_target_edge = route_check.fixed_edges()[1]
@@ -273,11 +298,13 @@ def route_to_edge(vehID: str, target_edge: str) -> bool:
     traci.vehicle.resume(vehID=vehID)
     return True
 
-def route_to_edge_for_optimization(taxi_fleet_state_wrapper: TaxiFleetStateWrapper, vehID: str, target_edge: str) -> bool:
+def route_to_edge_for_optimization(taxi_fleet_state_wrapper: TaxiFleetStateWrapper, vehID: str, target_edge: str,
+                                   router=None) -> bool:
     """
     generate a route to target_edge and set it for vehID
+    router: see route_to_edge
     """
-    if route_to_edge(vehID, target_edge):
+    if route_to_edge(vehID, target_edge, router):
         taxi_fleet_state_wrapper.set_optimizing_state(vehID)
         return True
     return False
\ No newline at end of file
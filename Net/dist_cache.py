@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides a disk cache for distance matrices
+# The matrices are stored as .npy files in a directory named by a hash of
+# the net file, the ordered POI edges and the routing parameters.
+# The routes are stored as arrays of a Net.route_store.RouteStore.
+# They are loaded memory-mapped and read-only, so a cached matrix is
+# available at once and shared by concurrent runs.
+# A matrix of other POIs of the same net is the base of an incremental update
+# (Net.poi_manager.POI_Manager.update_dist_matrix).
+# =============================================================================
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.logger import dlog
+from Net.route_store import RouteStore
+from Net.poi_manager import poi_key
+
+# increase if the stored format changes
+CACHE_VERSION = 3
+
+# minimal part of the POIs in a base matrix of an update
+MIN_OVERLAP = 0.5
+
+
+def net_key(net_file, **params):
+    """
+    returns the cache key of the net and the routing parameters
+    """
+    h = hashlib.sha256()
+    h.update(f"version {CACHE_VERSION}\n".encode())
+    with open(net_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()[:32]
+
+
+def distances_key(base_key, poi_arr):
+    """
+    returns the cache key of the distance matrix between the POIs
+    base_key: net_key() of the net
+    """
+    h = hashlib.sha256(base_key.encode())
+    keys = [f"{edge_id} {pos}" for (edge_id, pos) in map(poi_key, poi_arr)]
+    h.update("\n".join(keys).encode())
+    return h.hexdigest()[:32]
+
+
+class CachedDistances(DotDict):
+    """
+    distances with memory-mapped dist_array and time_array
+    edges_array is opened on first access, its arrays memory-mapped
+    pickled as reference to the cache, not as matrices
+    """
+
+    def __getattr__(self, key):
+        if key == "edges_array" and key not in self:
+            self[key] = open_routes(self.path, len(self.dist_array))
+        return self.get(key)
+
+    def __reduce__(self):
+        return (open_distances, (self.path,))
+
+
+def open_routes(path, n):
+    """
+    returns the RouteStore of the cached distances between n POIs in directory path
+    """
+    with open(os.path.join(path, "edge_ids.json")) as f:
+        edge_ids = json.load(f)
+    edges = np.load(os.path.join(path, "route_edges.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(path, "route_offsets.npy"), mmap_mode="r")
+    return RouteStore(n, edge_ids, edges, offsets)
+
+
+def open_distances(path):
+    """
+    returns the cached distances in directory path
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    obj = CachedDistances()
+    obj.path = path
+    obj.dist_array = np.load(os.path.join(path, "dist.npy"), mmap_mode="r")
+    obj.time_array = np.load(os.path.join(path, "time.npy"), mmap_mode="r")
+    obj.average_speed = meta["average_speed"]
+    obj.base_key = meta["base_key"]
+    obj.poi_keys = meta["poi_keys"]
+    return obj
+
+
+def read_meta(path):
+    """
+    returns meta.json of the cached distances in directory path,
+    None if there is none or it is of another CACHE_VERSION
+    """
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+
+def load_distances(cache_dir, key):
+    """
+    returns the cached distances, None if not in the cache
+    """
+    path = os.path.join(cache_dir, key)
+    if read_meta(path) is None:
+        return None
+    dlog(f"distance matrix from cache {path}")
+    return open_distances(path)
+
+
+def find_base(cache_dir, base_key, poi_arr):
+    """
+    returns the cached distances of the same net with most POIs in common,
+    None if there is none with MIN_OVERLAP of the POIs
+    """
+    if not os.path.isdir(cache_dir):
+        return None
+    keys = [poi_key(poi) for poi in poi_arr]
+    best = None
+    best_overlap = MIN_OVERLAP * len(keys)
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        meta = read_meta(path)
+        if meta is None or meta.get("base_key") != base_key:
+            continue
+        overlap = len(set(keys) & {tuple(key) for key in meta["poi_keys"]})
+        if overlap > best_overlap:
+            (best, best_overlap) = (path, overlap)
+    if best is None:
+        return None
+    dlog(f"distance matrix update of {best}")
+    return open_distances(best)
+
+
+def save_distances(cache_dir, key, distances, average_speed, base_key, poi_arr):
+    """
+    store the distances between the POIs in the cache,
+    returns the cached distances
+    written to a temporary directory first: readers never see partial files
+    """
+    path = os.path.join(cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp_")
+    for name, a in (("dist", distances.dist_array), ("time", distances.time_array)):
+        np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(a, dtype=np.float64))
+    routes = distances.edges_array
+    (edges, offsets) = routes.arrays()
+    np.save(os.path.join(tmp, "route_edges.npy"), np.asarray(edges))
+    np.save(os.path.join(tmp, "route_offsets.npy"), np.asarray(offsets))
+    with open(os.path.join(tmp, "edge_ids.json"), "w") as f:
+        json.dump(routes.edge_ids, f)
+    # meta.json marks a complete entry
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        meta = {
+            "version": CACHE_VERSION,
+            "average_speed": average_speed,
+            "base_key": base_key,
+            "poi_keys": [poi_key(poi) for poi in poi_arr],
+        }
+        json.dump(meta, f)
+    if os.path.isdir(path) and read_meta(path) is None:
+        # stale entry: of another version or not complete
+        remove_entry(path)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # stored by a concurrent run
+        remove_entry(tmp)
+    dlog(f"distance matrix stored in cache {path}")
+    return open_distances(path)
+
+
+def remove_entry(path):
+    """
+    remove the files of a cache entry
+    """
+    try:
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+        os.rmdir(path)
+    except OSError as e:
+        dlog(f"cache entry {path} not removed: {e}")
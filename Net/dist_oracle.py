@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides the DistanceOracle- Class, distances between POIs
+# calculated on first use instead of the full distance matrix:
+#   same access as the matrices: dist_array[i][j], time_array[i][j]
+#   NumPy indexing with index arrays: dist_array[from_idx, to_idx]
+#   the known pairs are kept up to a capacity (least recently used dropped)
+#   and pickled with the project
+#   never converted to the full matrix: np.asarray raises TypeError
+# =============================================================================
+
+
+from collections import OrderedDict
+
+import numpy as np
+
+# default number of pairs kept
+CAPACITY = 1000000
+
+
+class OracleRow:
+    """
+    distances from one POI, matrix[i][j] compatible
+    """
+
+    def __init__(self, matrix, i):
+        self.matrix = matrix
+        self.i = i
+
+    def __getitem__(self, j):
+        return self.matrix.oracle.pair(self.i, j)[self.matrix.field]
+
+    def __len__(self):
+        return self.matrix.oracle.n
+
+    def __iter__(self):
+        return (self[j] for j in range(len(self)))
+
+
+class OracleMatrix:
+    """
+    one matrix of the oracle: 0 distances, 1 times, 2 routes
+    """
+
+    def __init__(self, oracle, field):
+        self.oracle = oracle
+        self.field = field
+
+    def __len__(self):
+        return self.oracle.n
+
+    def __iter__(self):
+        return (OracleRow(self, i) for i in range(len(self)))
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            return OracleRow(self, key)
+        (rows, cols) = np.broadcast_arrays(*key)
+        pair = self.oracle.pair
+        field = self.field
+        values = np.fromiter(
+            (
+                pair(i, j)[field]
+                for (i, j) in zip(rows.ravel().tolist(), cols.ravel().tolist())
+            ),
+            dtype=np.float64,
+            count=rows.size,
+        )
+        return values.reshape(rows.shape) if rows.ndim else values[0]
+
+    def __array__(self, dtype=None, copy=None):
+        # defined: NumPy would build the full matrix row by row otherwise
+        raise TypeError(
+            f"no full matrix ({self.oracle.n}x{self.oracle.n}) from the distance oracle"
+        )
+
+
+class DistanceOracle:
+    """
+    distances between n POIs, calculated on first use
+    - route(i, j): (distance, time, edges) from POI i to POI j,
+      (0, 0, 0) if there is no route
+    - capacity: number of pairs kept
+    pickled with the known pairs, route has to be set after loading
+    """
+
+    def __init__(self, n, route=None, capacity=CAPACITY):
+        self.n = n
+        self.route = route
+        self.capacity = capacity
+        self.pairs = OrderedDict()
+        self.dist_array = OracleMatrix(self, 0)
+        self.time_array = OracleMatrix(self, 1)
+        self.edges_array = OracleMatrix(self, 2)
+
+    def pair(self, i, j):
+        """
+        returns (distance, time, edges) from POI i to POI j
+        """
+        k = i * self.n + j
+        entry = self.pairs.get(k)
+        if entry is not None:
+            self.pairs.move_to_end(k)
+            return entry
+        if i == j:
+            return (0, 0, 0)
+        entry = self.route(i, j)
+        self.pairs[k] = entry
+        if len(self.pairs) > self.capacity:
+            self.pairs.popitem(last=False)
+        return entry
+
+    def __getstate__(self):
+        return {
+            "n": self.n,
+            "capacity": self.capacity,
+            "pairs": list(self.pairs.items()),
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["n"], capacity=state["capacity"])
+        self.pairs.update(state["pairs"])
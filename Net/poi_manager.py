@@ -15,27 +15,110 @@
 
 from Tools.logger import dlog, elog
 import random
+from bisect import bisect_left, bisect_right
 from typing import List
 import json
 import codecs
+from concurrent.futures import ThreadPoolExecutor
 
 import xml.etree.ElementTree as ET
+import numpy as np
 
 from Tools.dotdict import DotDict
 from Net.point_of_interest import Point_of_Interest, PARKING_POI
+from Net.road_graph import poi_distance_matrix
+from Net.route_store import RouteStore
+
+
+# tolerance of near()
+NEAR = 0.1
 
 
 def near(f1: float, f2: float) -> bool:
-    return abs(f1 - f2) < 0.1
+    return abs(f1 - f2) < NEAR
+
+
+def poi_key(poi: Point_of_Interest):
+    """
+    POIs with the same key have the same distances
+    """
+    return (poi.edge_id, round(poi.pos, 1))
 
 
 class POI_Manager:
     def __init__(self):
         self.poi_arr = []
-        self.valid_edges = []
+        self.valid_edges = set()
         self.edge_dict = {}
         self.average_speed = 1
 
+    @property
+    def poi_arr(self):
+        return self._poi_arr
+
+    @poi_arr.setter
+    def poi_arr(self, poi_arr):
+        self._poi_arr = poi_arr
+        self._edge_index = None
+        self._type_index = None
+
+    def edge_index(self):
+        """
+        returns {edge_id: (positions, [(order, poi)])}, the POIs of each edge
+        sorted by position, order: index in poi_arr
+        built on first use, kept up to date by add()
+        """
+        if self._edge_index is None:
+            index = {}
+            for order, poi in enumerate(self.poi_arr):
+                index.setdefault(poi.edge_id, []).append((poi.pos, order, poi))
+            self._edge_index = {}
+            for edge_id, entries in index.items():
+                entries.sort(key=lambda entry: entry[:2])
+                self._edge_index[edge_id] = (
+                    [entry[0] for entry in entries],
+                    [entry[1:] for entry in entries],
+                )
+        return self._edge_index
+
+    def type_index(self):
+        """
+        returns the POIs in poi_arr order:
+        - by_type: {poi_type: POIs}
+        - non_parking: POIs without PARKING_POI type
+        - walk: POIs with walk lane
+        - walk_by_type: {poi_type: POIs with walk lane, poi_type in their type}
+          filled on first use of a poi_type
+        built on first use, kept up to date by add()
+        """
+        if self._type_index is None:
+            self._type_index = DotDict()
+            self._type_index.by_type = {}
+            self._type_index.non_parking = []
+            self._type_index.walk = []
+            self._type_index.walk_by_type = {}
+            for poi in self.poi_arr:
+                self.index_type(poi)
+        return self._type_index
+
+    def index_type(self, poi: Point_of_Interest):
+        index = self._type_index
+        index.by_type.setdefault(poi.poi_type, []).append(poi)
+        if poi.poi_type != PARKING_POI:
+            index.non_parking.append(poi)
+        if poi.walk_lane != None:
+            index.walk.append(poi)
+            for poi_type, filtered in index.walk_by_type.items():
+                if poi_type in poi.poi_type:
+                    filtered.append(poi)
+
+    def __getstate__(self):
+        # the indexes are built again on first use
+        state = self.__dict__.copy()
+        state["_edge_index"] = None
+        state["_type_index"] = None
+        return state
+
     def get_speed(self):
         return self.average_speed
 
@@ -47,6 +130,14 @@ class POI_Manager:
 
     def add(self, poi: Point_of_Interest):
         self.poi_arr.append(poi)
+        if self._edge_index is not None:
+            (positions, entries) = self._edge_index.setdefault(poi.edge_id, ([], []))
+            # the new POI is the last in poi_arr: after the same positions
+            k = bisect_right(positions, poi.pos)
+            positions.insert(k, poi.pos)
+            entries.insert(k, (len(self.poi_arr) - 1, poi))
+        if self._type_index is not None:
+            self.index_type(poi)
 
     def add_lane_to_edge(self, edge_id, lane_id):
         if edge_id not in self.edge_dict:
@@ -76,10 +167,10 @@ class POI_Manager:
         return random.choice(self.poi_arr)
 
     def parking_POI(self) -> List[Point_of_Interest]:
-        return [poi for poi in self.poi_arr if poi.poi_type == PARKING_POI]
+        return list(self.type_index().by_type.get(PARKING_POI, []))
 
     def pre_parking(self, n):
-        filtered = [poi for poi in self.poi_arr if poi.poi_type == PARKING_POI]
+        filtered = self.type_index().by_type.get(PARKING_POI, [])
         num_parking = len(filtered)
         # if there is no parking left use other pois
         if num_parking == 0:
@@ -92,50 +183,124 @@ class POI_Manager:
         return filtered[idx]
 
     def find_poi(self, edge, pos):
-        for poi in self.poi_arr:
-            if poi.edge_id == edge:
-                if near(poi.pos, pos):
-                    return poi
+        """
+        returns the first POI of poi_arr on edge near pos
+        """
+        (positions, entries) = self.edge_index().get(edge, ((), ()))
+        lo = bisect_left(positions, pos - NEAR)
+        hi = bisect_right(positions, pos + NEAR)
+        found = [entry for entry in entries[lo:hi] if near(entry[1].pos, pos)]
+        if found:
+            return min(found, key=lambda entry: entry[0])[1]
         elog(f"do not find POI at edge {edge} {pos}")
         return None
 
     def non_parking(self):
-        filtered = [poi for poi in self.poi_arr if poi.poi_type != PARKING_POI]
-        return random.choice(filtered)
+        return random.choice(self.type_index().non_parking)
 
     def random_poi_by_type(self, poi_type=PARKING_POI):
-        filtered = [poi for poi in self.poi_arr if poi.poi_type == poi_type]
+        filtered = self.type_index().by_type.get(poi_type)
         if filtered:
             return random.choice(filtered)
         return random.choice(self.poi_arr)
 
     def poi_by_walk(self):
-        return [poi for poi in self.poi_arr if poi.walk_lane != None]
+        return list(self.type_index().walk)
 
     def random_poi_by_walk(self):
-        filtered = [poi for poi in self.poi_arr if poi.walk_lane != None]
+        filtered = self.type_index().walk
         if filtered:
             return random.choice(filtered)
         return random.choice(self.poi_arr)
 
     def random_poi_by_walk_and_type(self, poi_type):
-        filtered = [
-            poi
-            for poi in self.poi_arr
-            if poi.walk_lane != None and poi_type in poi.poi_type
-        ]
+        index = self.type_index()
+        filtered = index.walk_by_type.get(poi_type)
+        if filtered is None:
+            filtered = index.walk_by_type[poi_type] = [
+                poi for poi in index.walk if poi_type in poi.poi_type
+            ]
         if filtered:
             return random.choice(filtered)
         return random.choice(self.poi_arr)
 
     def clean(self, valid_edges):
-        filtered = [poi for poi in self.poi_arr if poi.edge_id in valid_edges]
-        self.poi_arr = filtered
-        self.valid_edges = valid_edges
+        self.valid_edges = set(valid_edges)
+        self.poi_arr = [
+            poi for poi in self.poi_arr if poi.edge_id in self.valid_edges
+        ]
 
     def edge_is_valid(self, edge_id):
         return edge_id in self.valid_edges
 
+    def poi_pair(self, traci, i, j):
+        """
+        returns (distance, time, edges) from POI i to POI j, (0, 0, 0) if there
+        is no route
+        traci: traci module or a labelled traci connection
+        """
+        (from_poi, to_poi) = (self.poi_arr[i], self.poi_arr[j])
+        stage_to = traci.simulation.findRoute(from_poi.edge_id, to_poi.edge_id)
+        if stage_to and len(stage_to.edges):
+            return (stage_to.length, stage_to.travelTime, stage_to.edges)
+        # this should not happen because sumo_reader cleaned roads
+        # and removed non-valid POIS
+        elog(f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}")
+        return (0, 0, 0)
+
+    def poi_row(self, traci, i):
+        """
+        returns (distances, times, routes) from POI i to all POIs
+        """
+        from_poi = self.poi_arr[i]
+        assert from_poi.idx == i
+        length = len(self.poi_arr)
+        dists = [0] * length
+        times = [0] * length
+        routes = [None] * length
+        for j, to_poi in enumerate(self.poi_arr):
+            assert to_poi.idx == j
+            # the road net is directed: i -> j may differ from j -> i
+            if from_poi != to_poi:
+                (dists[j], times[j], routes[j]) = self.poi_pair(traci, i, j)
+        return (dists, times, routes)
+
+    def poi_column(self, traci, j, sources):
+        """
+        returns (distances, times, routes) from the POIs in sources to POI j
+        the entries of the other POIs are 0
+        """
+        to_poi = self.poi_arr[j]
+        length = len(self.poi_arr)
+        dists = [0] * length
+        times = [0] * length
+        routes = [None] * length
+        for i in sources:
+            if self.poi_arr[i] != to_poi:
+                (dists[i], times[i], routes[i]) = self.poi_pair(traci, i, j)
+        return (dists, times, routes)
+
+    def traci_rows(self, traci, sources):
+        return {i: self.poi_row(traci, i) for i in sources}
+
+    def traci_columns(self, traci, targets, sources):
+        return {j: self.poi_column(traci, j, sources) for j in targets}
+
+    def merge_rows(self, rows):
+        """
+        returns the distance matrix of the rows of poi_row(), in POI order
+        """
+        obj = DotDict()
+        obj.dist_array = [row[0] for row in rows]
+        obj.time_array = [row[1] for row in rows]
+        obj.edges_array = RouteStore(len(rows))
+        for row in rows:
+            obj.edges_array.add_row(row[2])
+        distances = sum(sum(row[0]) for row in rows)
+        travel_times = sum(sum(row[1]) for row in rows)
+        self.average_speed = distances / travel_times
+        return obj
+
     def dist_matrix(self, traci, poi_arr=None):
         """
         calculate:
@@ -144,53 +309,126 @@ class POI_Manager:
         - edges/routes
         between POIs
         """
-        distances = 0
-        travel_times = 0
-
         if poi_arr:
             self.poi_arr = poi_arr
         length = len(self.poi_arr)
         dlog(f"Calculating distance matrix ({length}x{length}).")
-        dist_array = [[0 for i in range(length)] for j in range(length)]
-        time_array = [[0 for i in range(length)] for j in range(length)]
-        edges_array = [[0 for i in range(length)] for j in range(length)]
 
-        len_of_poi = len(self.poi_arr)
-        for i, from_poi in enumerate(self.poi_arr):
-            sum = 0
+        rows = []
+        for i in range(length):
             if i % 10 == 0:
-                dlog(f"distance {i:4d}:{len_of_poi}")
-            assert from_poi.idx == i
-            for j, to_poi in enumerate(self.poi_arr):
-                assert to_poi.idx == j
-                if from_poi != to_poi:
-                    if dist_array[j][i] > 0:
-                        dist_array[i][j] = dist_array[j][i]
-                        time_array[i][j] = time_array[j][i]
-                        edges_array[i][j] = edges_array[j][i]
-                    else:
-                        stage_to = traci.simulation.findRoute(
-                            from_poi.edge_id, to_poi.edge_id
-                        )
-                        if stage_to and len(stage_to.edges):
-                            distances += stage_to.length
-                            travel_times += stage_to.travelTime
-                            dist_array[i][j] = stage_to.length
-                            time_array[i][j] = stage_to.travelTime
-                            edges_array[i][j] = stage_to.edges
-                            sum += stage_to.length
-                        else:
-                            # this should not happen because sumo_reader cleaned roads
-                            # and removed non-valid POIS
-                            elog(
-                                f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}"
-                            )
+                dlog(f"distance {i:4d}:{length}")
+            rows.append(self.poi_row(traci, i))
+        return self.merge_rows(rows)
+
+    def shard_dist_matrix(self, traci, sumo_cmd, instances, poi_arr=None):
+        """
+        dist_matrix() with several SUMO instances:
+        the rows are shared round robin between the instances,
+        one labelled traci connection and thread per instance
+        (the threads wait for SUMO, the instances route in parallel)
+        sumo_cmd: command line to start SUMO without GUI
+        """
+        if poi_arr:
+            self.poi_arr = poi_arr
+        length = len(self.poi_arr)
+        dlog(f"Calculating distance matrix ({length}x{length}) with {instances} SUMO.")
+
+        labels = [f"dist_{k}" for k in range(instances)]
+        current = traci.getLabel()
+        for label in labels:
+            traci.start(sumo_cmd, label=label)
+        traci.switch(current)
+
+        def shard(k):
+            conn = traci.getConnection(labels[k])
+            sources = range(k, length, instances)
+            rows = {}
+            for n, i in enumerate(sources):
+                if n % 10 == 0:
+                    dlog(f"distance shard {k}: {n:4d}:{len(sources)}")
+                rows[i] = self.poi_row(conn, i)
+            dlog(f"distance shard {k}: done")
+            return rows
+
+        rows = {}
+        try:
+            with ThreadPoolExecutor(max_workers=instances) as pool:
+                for shard_rows in pool.map(shard, range(instances)):
+                    rows.update(shard_rows)
+        finally:
+            for label in labels:
+                traci.switch(label)
+                traci.close()
+            traci.switch(current)
+        return self.merge_rows([rows[i] for i in range(length)])
+
+    def net_dist_matrix(self, graph, poi_arr=None, processes=1):
+        """
+        dist_matrix() from the road graph of the net, SUMO is not needed
+        graph: Net.road_graph.RoadGraph
+        """
+        if poi_arr:
+            self.poi_arr = poi_arr
+        (obj, self.average_speed) = poi_distance_matrix(
+            graph, self.poi_arr, processes=processes
+        )
+        return obj
+
+    def update_dist_matrix(self, base, rows, columns, poi_arr=None):
+        """
+        dist_matrix() from the matrix of other POIs:
+        the entries between POIs of base are reused (same poi_key),
+        only the rows and columns of the new POIs are calculated
+        base: distances with poi_keys, the keys of its POIs
+        rows(sources): {i: (distances, times, routes)} from POIs i to all
+        columns(targets, sources): {j: (distances, times, routes)} to POIs j
+        """
+        if poi_arr:
+            self.poi_arr = poi_arr
+        length = len(self.poi_arr)
+        position = {}
+        for k, key in enumerate(base.poi_keys):
+            position.setdefault(tuple(key), k)
+        # each POI of base is used once, duplicates are new POIs
+        old = [position.pop(poi_key(poi), -1) for poi in self.poi_arr]
+        kept = [i for i in range(length) if old[i] >= 0]
+        new = [i for i in range(length) if old[i] < 0]
+        dlog(f"Updating distance matrix ({length}x{length}), {len(new)} new POI.")
+
+        new_rows = rows(new)
+        new_columns = columns(new, kept)
+        from_base = np.ix_(kept, kept)
+        in_base = np.ix_([old[i] for i in kept], [old[i] for i in kept])
+        matrices = []
+        for k, name in enumerate(("dist_array", "time_array")):
+            a = np.zeros((length, length))
+            a[from_base] = np.asarray(getattr(base, name))[in_base]
+            for i in new:
+                a[i, :] = new_rows[i][k]
+            for j in new:
+                a[kept, j] = np.asarray(new_columns[j][k])[kept]
+            matrices.append(a)
+
+        base_routes = base.edges_array
+        routes = RouteStore(length, edge_ids=base_routes.edge_ids)
+        for i in range(length):
+            if old[i] < 0:
+                routes.add_row(new_rows[i][2])
+                continue
+            routes.add_index_row(
+                [
+                    base_routes.route_indices(old[i], old[j])
+                    if old[j] >= 0
+                    else routes.intern(new_columns[j][2][i])
+                    for j in range(length)
+                ]
+            )
 
         obj = DotDict()
-        obj.dist_array = dist_array
-        obj.time_array = time_array
-        obj.edges_array = edges_array
-        self.average_speed = distances / travel_times
+        (obj.dist_array, obj.time_array) = matrices
+        obj.edges_array = routes
+        self.average_speed = matrices[0].sum() / matrices[1].sum()
         return obj
 
     def empty_dist_matrix(self, poi_arr=None):
@@ -201,7 +439,9 @@ class POI_Manager:
         obj = DotDict()
         obj.dist_array = [[0 for i in range(length)] for j in range(length)]
         obj.time_array = [[0 for i in range(length)] for j in range(length)]
-        obj.edges_array = [[0 for i in range(length)] for j in range(length)]
+        obj.edges_array = RouteStore(length)
+        for i in range(length):
+            obj.edges_array.add_index_row([None] * length)
         return obj
 
     def same_edges(self):
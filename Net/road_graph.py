@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides the RoadGraph- Class, an array based graph of the
+# road edges of a SUMO net, and the distance matrix between POIs without
+# a running SUMO:
+#   the roads are the nodes of the graph, the connections its arcs
+#   one Dijkstra (fastest route, like traci.simulation.findRoute)
+#   from each POI edge, optionally in a process pool
+# =============================================================================
+
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.logger import dlog, elog
+from Net.route_store import RouteStore
+
+# graph and target edges of a worker process, set by init_worker
+worker_data = DotDict()
+
+
+class RoadGraph:
+    """
+    directed graph of the road edges
+    - edge_ids: SUMO edge ID of each node
+    - length: length of each edge
+    - time: free flow travel time of each edge
+    - indptr, indices: successors of node k are indices[indptr[k]:indptr[k + 1]]
+    - rindptr, rindices: predecessors of node k, same layout
+    """
+
+    def __init__(self, edge_ids, lengths, speeds, from_to):
+        self.edge_ids = list(edge_ids)
+        self.index = {eid: k for k, eid in enumerate(self.edge_ids)}
+        self.length = np.asarray(lengths, dtype=np.float64)
+        self.time = self.length / np.asarray(speeds, dtype=np.float64)
+        indptr = [0]
+        indices = []
+        for eid in self.edge_ids:
+            to_edges = from_to.get(eid, [])
+            successors = {self.index[e] for e in to_edges if e in self.index}
+            indices += sorted(successors)
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        # reversed arcs, sorted by head
+        tails = np.repeat(np.arange(len(self.edge_ids)), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        self.rindices = tails[order]
+        counts = np.bincount(self.indices, minlength=len(self.edge_ids))
+        self.rindptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._lists = None
+
+    def __len__(self):
+        return len(self.edge_ids)
+
+    def lists(self):
+        """
+        returns (time, length, indptr, indices) as lists, kept for the next search
+        """
+        if self._lists is None:
+            self._lists = (
+                self.time.tolist(),
+                self.length.tolist(),
+                self.indptr.tolist(),
+                self.indices.tolist(),
+            )
+        return self._lists
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_lists"] = None
+        return state
+
+    def shortest_paths(self, source):
+        """
+        fastest routes from the begin of edge source to the end of all edges
+        returns (time, length, pred) lists, time inf if not reachable
+        pred: previous node on the route, -1 for the source
+        """
+        n = len(self.edge_ids)
+        (edge_time, edge_length, indptr, indices) = self.lists()
+        inf = float("inf")
+        time = [inf] * n
+        length = [0.0] * n
+        pred = [-1] * n
+        time[source] = edge_time[source]
+        length[source] = edge_length[source]
+        heap = [(time[source], source)]
+        while heap:
+            t, u = heapq.heappop(heap)
+            if t > time[u]:
+                continue
+            lu = length[u]
+            for v in indices[indptr[u] : indptr[u + 1]]:
+                tv = t + edge_time[v]
+                if tv < time[v]:
+                    time[v] = tv
+                    length[v] = lu + edge_length[v]
+                    pred[v] = u
+                    heapq.heappush(heap, (tv, v))
+        return (time, length, pred)
+
+    def reachable(self, node, reverse=False):
+        """
+        returns a bool array: which nodes are reachable from node
+        (reverse: from which nodes node is reachable)
+        """
+        if reverse:
+            (indptr, indices) = (self.rindptr.tolist(), self.rindices.tolist())
+        else:
+            (indptr, indices) = self.lists()[2:]
+        seen = np.zeros(len(self.edge_ids), dtype=bool)
+        seen[node] = True
+        stack = [node]
+        while stack:
+            u = stack.pop()
+            for v in indices[indptr[u] : indptr[u + 1]]:
+                if not seen[v]:
+                    seen[v] = True
+                    stack.append(v)
+        return seen
+
+    def strong_component(self, node):
+        """
+        returns the edge IDs of the strongly connected component of node:
+        the edges with a route from node and a route to node
+        """
+        both = self.reachable(node) & self.reachable(node, reverse=True)
+        return [self.edge_ids[k] for k in np.flatnonzero(both).tolist()]
+
+    def shortest_path(self, source, target):
+        """
+        fastest route from the begin of edge source to the end of edge target,
+        the search stops at target
+        returns (time, length, nodes), None if target is not reachable
+        """
+        (edge_time, edge_length, indptr, indices) = self.lists()
+        time = {source: edge_time[source]}
+        length = {source: edge_length[source]}
+        pred = {source: -1}
+        heap = [(time[source], source)]
+        while heap:
+            t, u = heapq.heappop(heap)
+            if t > time[u]:
+                continue
+            if u == target:
+                return (t, length[u], self.route_nodes(pred, source, target))
+            lu = length[u]
+            for v in indices[indptr[u] : indptr[u + 1]]:
+                tv = t + edge_time[v]
+                if tv < time.get(v, float("inf")):
+                    time[v] = tv
+                    length[v] = lu + edge_length[v]
+                    pred[v] = u
+                    heapq.heappush(heap, (tv, v))
+        return None
+
+    def average_speed(self):
+        """
+        length / travel time of all edges
+        """
+        return self.length.sum() / self.time.sum()
+
+    def shortest_paths_to(self, target):
+        """
+        fastest routes from the begin of all edges to the end of edge target
+        returns (time, length, succ) lists, time inf if target is not reachable
+        succ: next node on the route, -1 for the target
+        """
+        n = len(self.edge_ids)
+        edge_time = self.time.tolist()
+        edge_length = self.length.tolist()
+        indptr = self.rindptr.tolist()
+        indices = self.rindices.tolist()
+        inf = float("inf")
+        time = [inf] * n
+        length = [0.0] * n
+        succ = [-1] * n
+        time[target] = edge_time[target]
+        length[target] = edge_length[target]
+        heap = [(time[target], target)]
+        while heap:
+            t, v = heapq.heappop(heap)
+            if t > time[v]:
+                continue
+            lv = length[v]
+            for u in indices[indptr[v] : indptr[v + 1]]:
+                tu = t + edge_time[u]
+                if tu < time[u]:
+                    time[u] = tu
+                    length[u] = lv + edge_length[u]
+                    succ[u] = v
+                    heapq.heappush(heap, (tu, u))
+        return (time, length, succ)
+
+    def route_nodes_to(self, succ, source, target):
+        """
+        returns the nodes of the route from source to target, see shortest_paths_to
+        """
+        nodes = [source]
+        while nodes[-1] != target:
+            nodes.append(succ[nodes[-1]])
+        return nodes
+
+    def route_nodes(self, pred, source, target):
+        """
+        returns the nodes of the route from source to target
+        """
+        nodes = [target]
+        while nodes[-1] != source:
+            nodes.append(pred[nodes[-1]])
+        nodes.reverse()
+        return nodes
+
+    def route(self, pred, source, target):
+        """
+        returns the edge IDs of the route from source to target
+        """
+        return [self.edge_ids[k] for k in self.route_nodes(pred, source, target)]
+
+
+def road_graph(edge_dict):
+    """
+    returns the RoadGraph of the edges with a vehicle lane
+    edge_dict: edges of Project.sumo_reader.SumoReader
+    """
+    roads = [e for e in edge_dict.values() if e.vehicle_lane]
+    return RoadGraph(
+        [e.eid for e in roads],
+        [e.length for e in roads],
+        [e.speed for e in roads],
+        {e.eid: e.from_to for e in roads},
+    )
+
+
+def init_worker(graph, targets, with_edges):
+    worker_data.graph = graph
+    worker_data.targets = targets
+    worker_data.with_edges = with_edges
+
+
+def poi_routes(source):
+    """
+    returns (times, lengths, routes) from source to all target nodes
+    routes: lists of graph nodes
+    """
+    graph = worker_data.graph
+    (time, length, pred) = graph.shortest_paths(source)
+    targets = worker_data.targets
+    times = [time[t] for t in targets]
+    lengths = [length[t] for t in targets]
+    routes = None
+    if worker_data.with_edges:
+        routes = [
+            graph.route_nodes(pred, source, t) if time[t] < float("inf") else None
+            for t in targets
+        ]
+    return (times, lengths, routes)
+
+
+def poi_distance_matrix(graph, poi_arr, processes=1, with_edges=True):
+    """
+    calculate distances, times and edges/routes between POIs
+    same format as Net.poi_manager.POI_Manager.dist_matrix
+    the routes are stored with the node indices of the graph (Net.route_store)
+    processes: number of worker processes, None for all CPUs
+    returns (distances, average speed)
+    """
+    length = len(poi_arr)
+    dlog(f"Calculating distance matrix ({length}x{length}) from the net.")
+    # one Dijkstra per distinct POI edge
+    edges = sorted({poi.edge_id for poi in poi_arr if poi.edge_id in graph.index})
+    column = {eid: k for k, eid in enumerate(edges)}
+    nodes = [graph.index[eid] for eid in edges]
+
+    if processes == 1:
+        init_worker(graph, nodes, with_edges)
+        rows = [poi_routes(source) for source in nodes]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=init_worker,
+            initargs=(graph, nodes, with_edges),
+        ) as pool:
+            rows = list(pool.map(poi_routes, nodes, chunksize=8))
+
+    dist_array = [[0 for i in range(length)] for j in range(length)]
+    time_array = [[0 for i in range(length)] for j in range(length)]
+    edges_array = RouteStore(length, edge_ids=graph.edge_ids)
+    distances = 0
+    travel_times = 0
+    for i, from_poi in enumerate(poi_arr):
+        row = column.get(from_poi.edge_id)
+        route_row = [None] * length
+        for j, to_poi in enumerate(poi_arr):
+            if from_poi == to_poi:
+                continue
+            k = column.get(to_poi.edge_id)
+            if row is None or k is None or rows[row][0][k] == float("inf"):
+                elog(f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}")
+                continue
+            (times, lengths, routes) = rows[row]
+            dist_array[i][j] = lengths[k]
+            time_array[i][j] = times[k]
+            if with_edges:
+                route_row[j] = routes[k]
+            distances += lengths[k]
+            travel_times += times[k]
+        edges_array.add_index_row(route_row)
+    edges_array.compact()
+
+    obj = DotDict()
+    obj.dist_array = dist_array
+    obj.time_array = time_array
+    obj.edges_array = edges_array
+    average_speed = distances / travel_times if travel_times else 1
+    return (obj, average_speed)
+
+
+def poi_rows(graph, poi_arr, sources):
+    """
+    returns {i: (distances, times, routes)} from the POIs i in sources
+    to all POIs, routes as edge IDs
+    """
+    rows = {}
+    for i in sources:
+        from_poi = poi_arr[i]
+        dists = [0] * len(poi_arr)
+        times = [0] * len(poi_arr)
+        routes = [None] * len(poi_arr)
+        source = graph.index.get(from_poi.edge_id)
+        if source is not None:
+            (time, length, pred) = graph.shortest_paths(source)
+        for j, to_poi in enumerate(poi_arr):
+            if from_poi == to_poi:
+                continue
+            target = graph.index.get(to_poi.edge_id)
+            if source is None or target is None or time[target] == float("inf"):
+                elog(f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}")
+                continue
+            dists[j] = length[target]
+            times[j] = time[target]
+            routes[j] = graph.route(pred, source, target)
+        rows[i] = (dists, times, routes)
+    return rows
+
+
+def poi_columns(graph, poi_arr, targets, sources):
+    """
+    returns {j: (distances, times, routes)} from the POIs in sources
+    to the POIs j in targets, one backward search per target
+    the entries of the other POIs are 0
+    """
+    columns = {}
+    for j in targets:
+        to_poi = poi_arr[j]
+        dists = [0] * len(poi_arr)
+        times = [0] * len(poi_arr)
+        routes = [None] * len(poi_arr)
+        target = graph.index.get(to_poi.edge_id)
+        if target is not None:
+            (time, length, succ) = graph.shortest_paths_to(target)
+        for i in sources:
+            from_poi = poi_arr[i]
+            if from_poi == to_poi:
+                continue
+            source = graph.index.get(from_poi.edge_id)
+            if source is None or target is None or time[source] == float("inf"):
+                elog(f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}")
+                continue
+            dists[i] = length[source]
+            times[i] = time[source]
+            nodes = graph.route_nodes_to(succ, source, target)
+            routes[i] = [graph.edge_ids[k] for k in nodes]
+        columns[j] = (dists, times, routes)
+    return columns
+
+
+def poi_pair(graph, poi_arr, i, j):
+    """
+    returns (distance, time, edges) from POI i to POI j, (0, 0, 0) if there
+    is no route (for Net.dist_oracle.DistanceOracle)
+    """
+    (from_poi, to_poi) = (poi_arr[i], poi_arr[j])
+    source = graph.index.get(from_poi.edge_id)
+    target = graph.index.get(to_poi.edge_id)
+    found = None
+    if source is not None and target is not None:
+        found = graph.shortest_path(source, target)
+    if found is None:
+        elog(f"no path from poi {from_poi.poi_id} to {to_poi.poi_id}")
+        return (0, 0, 0)
+    (time, length, nodes) = found
+    return (length, time, [graph.edge_ids[k] for k in nodes])
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides the RouteStore- Class, a compact store of the routes
+# between all POIs (edges_array of the distance matrix):
+# the edge IDs are interned, the routes are stored as one array of edge
+# indices with offsets. Edge lists are created only when a route is used.
+# =============================================================================
+
+
+import numpy as np
+
+
+def route_length(route):
+    """
+    number of edges of a route, 0 or None for no route
+    """
+    return 0 if route is None or isinstance(route, int) else len(route)
+
+
+class RouteRow:
+    """
+    routes from one POI, edges_array[i][j] compatible
+    """
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+
+    def __getitem__(self, j):
+        return self.store.route(self.i, j)
+
+    def __len__(self):
+        return self.store.n
+
+
+class RouteStore:
+    """
+    routes between n POIs
+    - edge_ids: distinct edge IDs
+    - edges: edge indices of all routes, row by row
+    - offsets: route (i, j) is edges[offsets[k] : offsets[k + 1]], k = i * n + j
+    """
+
+    def __init__(self, n, edge_ids=None, edges=None, offsets=None):
+        self.n = n
+        self.edge_ids = list(edge_ids) if edge_ids is not None else []
+        self.index = {eid: k for k, eid in enumerate(self.edge_ids)}
+        self.edges = edges
+        self.offsets = offsets
+        # rows added but not yet joined
+        self.chunks = []
+        self.lengths = []
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return RouteRow(self, i)
+
+    def intern(self, route):
+        """
+        returns the edge indices of the route, a list of edge IDs
+        """
+        index = self.index
+        edge_ids = self.edge_ids
+        row = []
+        for eid in route or ():
+            k = index.get(eid)
+            if k is None:
+                k = index[eid] = len(edge_ids)
+                edge_ids.append(eid)
+            row.append(k)
+        return row
+
+    def add_row(self, routes):
+        """
+        append the routes from the next POI, lists of edge IDs
+        (0, None or empty if there is no route)
+        """
+        self.add_index_row([self.intern(route) for route in routes])
+
+    def route_indices(self, i, j):
+        """
+        returns the edge indices of the route from POI i to POI j
+        """
+        (edges, offsets) = self.arrays()
+        k = i * self.n + j
+        return edges[offsets[k] : offsets[k + 1]]
+
+    def add_index_row(self, routes):
+        """
+        append the routes from the next POI, lists of indices into edge_ids
+        """
+        assert len(routes) == self.n
+        lengths = [route_length(route) for route in routes]
+        self.lengths += lengths
+        self.chunks += [
+            np.asarray(route, dtype=np.int32)
+            for (route, n) in zip(routes, lengths)
+            if n
+        ]
+
+    def arrays(self):
+        """
+        returns (edges, offsets) with all added rows
+        """
+        # rows without any route add lengths only
+        if self.lengths or self.edges is None:
+            parts = [self.edges] if self.edges is not None else []
+            parts += self.chunks
+            self.edges = np.concatenate(parts) if parts else np.zeros(0, np.int32)
+            start = self.offsets[-1] if self.offsets is not None else 0
+            offsets = start + np.cumsum([0] + self.lengths, dtype=np.int64)
+            if self.offsets is not None:
+                offsets = np.concatenate([self.offsets[:-1], offsets])
+            self.offsets = offsets
+            self.chunks = []
+            self.lengths = []
+        return (self.edges, self.offsets)
+
+    def compact(self):
+        """
+        drop the edge IDs not used by any route
+        """
+        (edges, offsets) = self.arrays()
+        (used, edges) = np.unique(edges, return_inverse=True)
+        self.edges = edges.astype(np.int32)
+        self.edge_ids = [self.edge_ids[k] for k in used.tolist()]
+        self.index = {eid: k for k, eid in enumerate(self.edge_ids)}
+
+    def route(self, i, j):
+        """
+        returns the list of edge IDs from POI i to POI j, 0 if there is none
+        """
+        route = self.route_indices(i, j)
+        if not len(route):
+            return 0
+        edge_ids = self.edge_ids
+        return [edge_ids[e] for e in route.tolist()]
+
+    def __getstate__(self):
+        self.arrays()
+        return {
+            "n": self.n,
+            "edge_ids": self.edge_ids,
+            "edges": np.asarray(self.edges),
+            "offsets": np.asarray(self.offsets),
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides the AltRouter- Class, fastest routes between road
+# edges without a TraCI call:
+#   A* search with landmark lower bounds (ALT) on Net.road_graph.RoadGraph
+#   the landmark times are calculated once and stored in a .npz file
+# =============================================================================
+
+
+import heapq
+import os
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.logger import dlog
+
+# default number of landmarks
+LANDMARKS = 8
+
+# stands for "not reachable" in the landmark times, keeps the bounds finite
+UNREACHABLE = 1e12
+
+
+class AltRouter:
+    """
+    fastest routes on a RoadGraph, same results as graph.shortest_path
+    - from_lm[v, k]: time from landmark k to the end of edge v
+    - to_lm[v, k]: time from the end of edge v to the end of landmark k
+    """
+
+    def __init__(self, graph, from_lm, to_lm):
+        self.graph = graph
+        self.from_lm = from_lm
+        self.to_lm = to_lm
+        # bounds of the last target, dispatching asks many routes to one target
+        self.target = None
+        self.bounds = None
+
+    def lower_bounds(self, target):
+        """
+        lower bounds of the time from the end of each edge to the end of target
+        """
+        if target != self.target:
+            bounds = np.maximum(
+                (self.from_lm[target] - self.from_lm).max(axis=1),
+                (self.to_lm - self.to_lm[target]).max(axis=1),
+            )
+            self.bounds = np.maximum(bounds, 0.0).tolist()
+            self.target = target
+        return self.bounds
+
+    def route(self, from_edge, to_edge):
+        """
+        returns the fastest route like traci.simulation.findRoute:
+        DotDict with edges, length and travelTime, None if there is none
+        """
+        graph = self.graph
+        source = graph.index.get(from_edge)
+        target = graph.index.get(to_edge)
+        if source is None or target is None:
+            return None
+        (edge_time, edge_length, indptr, indices) = graph.lists()
+        time = {source: edge_time[source]}
+        length = {source: edge_length[source]}
+        pred = {source: -1}
+        bound = self.lower_bounds(target)
+        heap = [(time[source] + bound[source], source)]
+        while heap:
+            f, u = heapq.heappop(heap)
+            t = time[u]
+            if f > t + bound[u]:
+                continue
+            if u == target:
+                stage = DotDict()
+                nodes = graph.route_nodes(pred, source, target)
+                stage.edges = [graph.edge_ids[k] for k in nodes]
+                stage.length = length[u]
+                stage.travelTime = t
+                return stage
+            lu = length[u]
+            for v in indices[indptr[u] : indptr[u + 1]]:
+                tv = t + edge_time[v]
+                if tv < time.get(v, float("inf")):
+                    time[v] = tv
+                    length[v] = lu + edge_length[v]
+                    pred[v] = u
+                    heapq.heappush(heap, (tv + bound[v], v))
+        return None
+
+    def save(self, path):
+        np.savez(path, from_lm=self.from_lm, to_lm=self.to_lm)
+
+
+def landmark_times(graph, landmarks):
+    """
+    returns (from_lm, to_lm) of the landmark nodes, see AltRouter
+    """
+    from_lm = np.full((len(graph), len(landmarks)), UNREACHABLE)
+    to_lm = np.full((len(graph), len(landmarks)), UNREACHABLE)
+    for k, node in enumerate(landmarks):
+        time = np.array(graph.shortest_paths(node)[0])
+        reached = time < float("inf")
+        from_lm[reached, k] = time[reached]
+        time = np.array(graph.shortest_paths_to(node)[0])
+        reached = time < float("inf")
+        # measured from the end of v: without the time of edge v
+        to_lm[reached, k] = time[reached] - graph.time[reached]
+    return (from_lm, to_lm)
+
+
+def select_landmarks(graph, count=LANDMARKS):
+    """
+    farthest landmarks: each one the node with the longest time
+    from the landmarks before
+    """
+    landmarks = [0]
+    nearest = np.full(len(graph), np.inf)
+    while len(landmarks) < min(count, len(graph)):
+        time = np.array(graph.shortest_paths(landmarks[-1])[0])
+        nearest = np.minimum(nearest, time)
+        candidates = np.where(nearest < float("inf"), nearest, -1.0)
+        candidates[landmarks] = -1.0
+        node = int(candidates.argmax())
+        if candidates[node] < 0:
+            break
+        landmarks.append(node)
+    return landmarks
+
+
+def alt_router(graph, path=None, landmarks=LANDMARKS):
+    """
+    returns the AltRouter of the graph
+    path: .npz file of the landmark times, calculated and stored if missing
+    """
+    if path and os.path.exists(path):
+        with np.load(path) as f:
+            if f["from_lm"].shape[0] == len(graph):
+                dlog(f"router landmarks from {path}")
+                return AltRouter(graph, f["from_lm"], f["to_lm"])
+    dlog(f"router: {landmarks} landmarks for {len(graph)} edges")
+    (from_lm, to_lm) = landmark_times(graph, select_landmarks(graph, landmarks))
+    router = AltRouter(graph, from_lm, to_lm)
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        router.save(path)
+    return router
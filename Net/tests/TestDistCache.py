@@ -0,0 +1,120 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from functools import partial
+
+import numpy as np
+
+from Net import dist_cache, poi_manager, road_graph
+from Net.dist_cache import (
+    CACHE_VERSION,
+    distances_key,
+    find_base,
+    load_distances,
+    save_distances,
+)
+from Net.poi_manager import POI_Manager
+from Net.road_graph import poi_columns, poi_distance_matrix, poi_rows
+from Net.tests.graphs import random_graph, random_pois
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+dist_cache.dlog = poi_manager.dlog = road_graph.elog = road_graph.dlog = quiet
+
+
+class TestDistCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp.name
+        self.graph = random_graph(3)
+        self.pois = random_pois(3, self.graph)
+        (self.distances, _) = poi_distance_matrix(self.graph, self.pois)
+        self.key = distances_key("net", self.pois)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def save(self, key=None, pois=None, distances=None):
+        return save_distances(
+            self.cache_dir,
+            key or self.key,
+            distances or self.distances,
+            8.3,
+            "net",
+            pois or self.pois,
+        )
+
+    def assert_same(self, distances, cached):
+        np.testing.assert_array_equal(distances.dist_array, cached.dist_array)
+        np.testing.assert_array_equal(distances.time_array, cached.time_array)
+        n = len(distances.dist_array)
+        for i in range(n):
+            for j in range(n):
+                self.assertEqual(distances.edges_array[i][j], cached.edges_array[i][j])
+
+    def test_round_trip(self):
+        self.assertIsNone(load_distances(self.cache_dir, self.key))
+        self.save()
+        cached = load_distances(self.cache_dir, self.key)
+        self.assert_same(self.distances, cached)
+        self.assertEqual(8.3, cached.average_speed)
+        # pickled as reference to the cache
+        self.assert_same(self.distances, pickle.loads(pickle.dumps(cached)))
+
+    def test_saved_twice(self):
+        self.save()
+        self.assert_same(self.distances, self.save())
+        self.assertEqual([self.key], os.listdir(self.cache_dir))
+
+    def test_stale_entry(self):
+        cached = self.save()
+        meta = os.path.join(cached.path, "meta.json")
+        with open(meta) as f:
+            content = json.load(f)
+        for stale in ({**content, "version": CACHE_VERSION - 1}, None):
+            with open(meta, "w") as f:
+                if stale is None:
+                    f.write("{")
+                else:
+                    json.dump(stale, f)
+            self.assertIsNone(load_distances(self.cache_dir, self.key))
+            self.assertIsNone(find_base(self.cache_dir, "net", self.pois))
+            # replaced by the next save
+            self.assert_same(self.distances, self.save())
+            self.assertIsNotNone(load_distances(self.cache_dir, self.key))
+
+    def test_find_base(self):
+        self.save()
+        self.assertIsNone(find_base(self.cache_dir, "other net", self.pois))
+        more = self.pois + random_pois(4, self.graph, n_poi=4)
+        base = find_base(self.cache_dir, "net", more)
+        self.assertEqual(os.path.join(self.cache_dir, self.key), base.path)
+        # the base has less than MIN_OVERLAP of the POIs
+        self.assertIsNone(find_base(self.cache_dir, "net", self.pois[:2] + more * 2))
+
+    def test_update(self):
+        base = self.save()
+        # some POIs dropped, new ones and a duplicate of a base POI
+        pois = self.pois[2:] + random_pois(5, self.graph, n_poi=4) + self.pois[3:4]
+        poi_mgr = POI_Manager()
+        distances = poi_mgr.update_dist_matrix(
+            base,
+            partial(poi_rows, self.graph, pois),
+            partial(poi_columns, self.graph, pois),
+            poi_arr=pois,
+        )
+        (expected, _) = poi_distance_matrix(self.graph, pois)
+        np.testing.assert_allclose(expected.dist_array, distances.dist_array)
+        np.testing.assert_allclose(expected.time_array, distances.time_array)
+        for i in range(len(pois)):
+            for j in range(len(pois)):
+                self.assertEqual(expected.edges_array[i][j], distances.edges_array[i][j])
+
+
+if __name__ == '__main__':
+    unittest.main()
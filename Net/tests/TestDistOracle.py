@@ -0,0 +1,66 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from Net.dist_oracle import DistanceOracle
+
+
+def route(i, j):
+    return (10.0 * i + j, i + 0.5 * j, [f"e{i}", f"e{j}"])
+
+
+class TestDistOracle(unittest.TestCase):
+    def test_matrix_access(self):
+        oracle = DistanceOracle(5, route)
+        for i in range(5):
+            for j in range(5):
+                expected = route(i, j) if i != j else (0, 0, 0)
+                self.assertEqual(expected[0], oracle.dist_array[i][j])
+                self.assertEqual(expected[1], oracle.time_array[i][j])
+                self.assertEqual(expected[2], oracle.edges_array[i][j])
+        self.assertEqual(5, len(oracle.dist_array))
+        self.assertEqual(5, len(oracle.time_array[2]))
+
+    def test_index_arrays(self):
+        oracle = DistanceOracle(5, route)
+        rows = np.array([0, 1, 4])
+        cols = np.array([2, 1, 3])
+        np.testing.assert_array_equal([2.0, 0.0, 43.0], oracle.dist_array[rows, cols])
+        self.assertEqual(12.0, oracle.dist_array[1, 2])
+
+    def test_no_full_matrix(self):
+        oracle = DistanceOracle(50, route)
+        with self.assertRaises(TypeError):
+            np.asarray(oracle.time_array)
+        self.assertEqual(0, len(oracle.pairs))
+
+    def test_capacity(self):
+        calls = []
+
+        def counted(i, j):
+            calls.append((i, j))
+            return route(i, j)
+
+        oracle = DistanceOracle(10, counted, capacity=3)
+        for j in (1, 2, 3):
+            oracle.dist_array[0][j]
+        oracle.dist_array[0][1]
+        oracle.dist_array[0][4]
+        self.assertEqual(3, len(oracle.pairs))
+        # (0, 2) least recently used: dropped
+        oracle.dist_array[0][1]
+        oracle.dist_array[0][2]
+        self.assertEqual([(0, 1), (0, 2), (0, 3), (0, 4), (0, 2)], calls)
+
+    def test_pickle(self):
+        oracle = DistanceOracle(5, route)
+        oracle.dist_array[1][2]
+        loaded = pickle.loads(pickle.dumps(oracle))
+        self.assertIsNone(loaded.route)
+        self.assertEqual(12.0, loaded.dist_array[1][2])
+        self.assertEqual(list(oracle.pairs.items()), list(loaded.pairs.items()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from Net import road_graph
+from Net.road_graph import poi_columns, poi_distance_matrix, poi_pair, poi_rows
+from Net.tests.graphs import all_pairs_times, random_graph, random_pois
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+road_graph.elog = road_graph.dlog = quiet
+
+
+class TestRoadGraph(unittest.TestCase):
+    def test_shortest_paths(self):
+        for seed in range(4):
+            graph = random_graph(seed)
+            expected = all_pairs_times(graph)
+            for source in range(len(graph)):
+                (time, length, pred) = graph.shortest_paths(source)
+                np.testing.assert_allclose(expected[source], time)
+                for target in range(len(graph)):
+                    if time[target] == float("inf"):
+                        self.assertIsNone(graph.shortest_path(source, target))
+                        continue
+                    nodes = graph.route_nodes(pred, source, target)
+                    self.assertAlmostEqual(time[target], graph.time[nodes].sum())
+                    self.assertAlmostEqual(length[target], graph.length[nodes].sum())
+                    found = graph.shortest_path(source, target)
+                    self.assertAlmostEqual(time[target], found[0])
+
+    def test_shortest_paths_to(self):
+        graph = random_graph(5)
+        expected = all_pairs_times(graph)
+        for target in range(len(graph)):
+            (time, _, succ) = graph.shortest_paths_to(target)
+            np.testing.assert_allclose([row[target] for row in expected], time)
+
+    def test_strong_component(self):
+        for seed in range(4):
+            graph = random_graph(seed)
+            d = all_pairs_times(graph)
+            for node in range(len(graph)):
+                expected = [
+                    graph.edge_ids[k]
+                    for k in range(len(graph))
+                    if d[node][k] < float("inf") and d[k][node] < float("inf")
+                ]
+                self.assertEqual(expected, graph.strong_component(node))
+
+    def test_poi_distance_matrix(self):
+        graph = random_graph(7)
+        pois = random_pois(7, graph)
+        d = all_pairs_times(graph)
+        (distances, _) = poi_distance_matrix(graph, pois)
+        (pooled, _) = poi_distance_matrix(graph, pois, processes=2)
+        rows = poi_rows(graph, pois, range(len(pois)))
+        columns = poi_columns(graph, pois, range(len(pois)), range(len(pois)))
+        for i, a in enumerate(pois):
+            for j, b in enumerate(pois):
+                t = distances.time_array[i][j]
+                route = distances.edges_array[i][j]
+                self.assertEqual(t, pooled.time_array[i][j])
+                self.assertEqual(route, pooled.edges_array[i][j])
+                self.assertEqual(t, rows[i][1][j])
+                self.assertAlmostEqual(t, columns[j][1][i])
+                if i == j:
+                    self.assertEqual((0, 0), (t, route))
+                    continue
+                self.assertAlmostEqual(t, poi_pair(graph, pois, i, j)[1])
+                if "missing" in (a.edge_id, b.edge_id):
+                    self.assertEqual((0, 0), (t, route))
+                    continue
+                u = graph.index[a.edge_id]
+                v = graph.index[b.edge_id]
+                if d[u][v] == float("inf"):
+                    # unreachable: no route
+                    self.assertEqual((0, 0), (t, route))
+                    continue
+                self.assertAlmostEqual(d[u][v], t)
+                self.assertEqual(route, rows[i][2][j])
+                self.assertEqual(route[0], a.edge_id)
+                self.assertEqual(route[-1], b.edge_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
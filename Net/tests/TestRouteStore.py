@@ -0,0 +1,95 @@
+import pickle
+import random
+import unittest
+
+from Net.route_store import RouteStore
+
+
+def random_rows(seed, n):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = []
+        for j in range(n):
+            if i == j or rnd.random() < 0.2:
+                row.append(rnd.choice([0, None, []]))
+            else:
+                row.append([f"e{rnd.randrange(50)}" for _ in range(rnd.randint(1, 8))])
+        rows.append(row)
+    return rows
+
+
+def expected(route):
+    return route if route else 0
+
+
+class TestRouteStore(unittest.TestCase):
+    def assert_rows(self, rows, store):
+        self.assertEqual(len(rows), len(store))
+        for i, row in enumerate(rows):
+            self.assertEqual(len(row), len(store[i]))
+            for j, route in enumerate(row):
+                self.assertEqual(expected(route), store[i][j])
+
+    def test_routes(self):
+        rows = random_rows(1, 12)
+        store = RouteStore(12)
+        for row in rows:
+            store.add_row(row)
+        self.assert_rows(rows, store)
+        self.assertEqual(len({e for row in rows for r in row if r for e in r}), len(store.edge_ids))
+
+    def test_rows_added_after_reading(self):
+        rows = random_rows(2, 6)
+        # rows without any route, read in between
+        rows[3] = [0] * 6
+        rows[5] = [None] * 6
+        store = RouteStore(6)
+        for k, row in enumerate(rows):
+            store.add_row(row)
+            self.assert_rows(rows[: k + 1], RouteRows(store, k + 1))
+
+    def test_compact(self):
+        rows = random_rows(3, 8)
+        store = RouteStore(8, edge_ids=[f"unused{k}" for k in range(5)])
+        for row in rows:
+            store.add_row(row)
+        store.compact()
+        self.assertFalse(any(eid.startswith("unused") for eid in store.edge_ids))
+        self.assert_rows(rows, store)
+
+    def test_pickle(self):
+        rows = random_rows(4, 8)
+        store = RouteStore(8)
+        for row in rows[:4]:
+            store.add_row(row)
+        store.arrays()
+        for row in rows[4:]:
+            store.add_row(row)
+        self.assert_rows(rows, pickle.loads(pickle.dumps(store)))
+
+    def test_empty(self):
+        store = RouteStore(0)
+        (edges, offsets) = store.arrays()
+        self.assertEqual(0, len(edges))
+        self.assertEqual([0], offsets.tolist())
+
+
+class RouteRows:
+    """
+    the first rows of a store
+    """
+
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        return self.store[i]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from Net import router as router_module
+from Net.router import alt_router
+from Net.tests.graphs import random_graph
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+router_module.dlog = quiet
+
+
+class TestRouter(unittest.TestCase):
+    def test_same_as_dijkstra(self):
+        for seed in range(4):
+            graph = random_graph(seed, degree=seed + 1)
+            router = alt_router(graph, landmarks=4)
+            for source in range(len(graph)):
+                (time, length, _) = graph.shortest_paths(source)
+                for target in range(len(graph)):
+                    stage = router.route(graph.edge_ids[source], graph.edge_ids[target])
+                    if time[target] == float("inf"):
+                        self.assertIsNone(stage)
+                        continue
+                    self.assertAlmostEqual(time[target], stage.travelTime)
+                    self.assertEqual(graph.edge_ids[source], stage.edges[0])
+                    self.assertEqual(graph.edge_ids[target], stage.edges[-1])
+                    nodes = [graph.index[e] for e in stage.edges]
+                    self.assertAlmostEqual(stage.length, graph.length[nodes].sum())
+
+    def test_unknown_edge(self):
+        router = alt_router(random_graph(1), landmarks=2)
+        self.assertIsNone(router.route("e1", "missing"))
+
+    def test_stored_landmarks(self):
+        graph = random_graph(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "router.npz")
+            router = alt_router(graph, path, landmarks=3)
+            self.assertTrue(os.path.exists(path))
+            loaded = alt_router(graph, path, landmarks=3)
+            self.assertEqual(router.from_lm.tolist(), loaded.from_lm.tolist())
+            self.assertEqual(router.to_lm.tolist(), loaded.to_lm.tolist())
+            # landmarks of another graph are not used
+            other = random_graph(2, n_edges=20)
+            self.assertEqual(20, alt_router(other, path, landmarks=3).from_lm.shape[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
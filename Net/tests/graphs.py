@@ -0,0 +1,58 @@
+import random
+
+from Net.point_of_interest import Point_of_Interest
+from Net.road_graph import RoadGraph
+
+
+# random road graphs for the tests: edges with random lengths and speeds,
+# a few connections per edge (some edges reachable from nowhere)
+def random_graph(seed, n_edges=40, degree=2):
+    rnd = random.Random(seed)
+    edge_ids = [f"e{k}" for k in range(n_edges)]
+    lengths = [rnd.uniform(10, 500) for _ in edge_ids]
+    speeds = [rnd.uniform(5, 30) for _ in edge_ids]
+    from_to = {
+        eid: [rnd.choice(edge_ids) for _ in range(rnd.randint(0, 2 * degree))]
+        for eid in edge_ids
+    }
+    return RoadGraph(edge_ids, lengths, speeds, from_to)
+
+
+def random_pois(seed, graph, n_poi=12):
+    rnd = random.Random(seed)
+    pois = []
+    for k in range(n_poi):
+        p = Point_of_Interest(f"p{k}", rnd.choice(graph.edge_ids))
+        p.idx = k
+        pois.append(p)
+    # one POI on an edge not in the graph: no route to or from it
+    p = Point_of_Interest(f"p{n_poi}", "missing")
+    p.idx = n_poi
+    pois.append(p)
+    return pois
+
+
+def all_pairs_times(graph):
+    """
+    Floyd-Warshall: fastest time from the begin of u to the end of v
+    """
+    n = len(graph)
+    time = graph.time.tolist()
+    inf = float("inf")
+    d = [[inf] * n for _ in range(n)]
+    for u in range(n):
+        d[u][u] = time[u]
+        for v in graph.indices[graph.indptr[u] : graph.indptr[u + 1]].tolist():
+            d[u][v] = min(d[u][v], time[u] + time[v])
+    for k in range(n):
+        dk = d[k]
+        for u in range(n):
+            duk = d[u][k]
+            if duk == inf:
+                continue
+            du = d[u]
+            for v in range(n):
+                t = duk + dk[v] - time[k]
+                if t < du[v]:
+                    du[v] = t
+    return d
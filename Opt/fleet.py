@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides a minimum fleet planner for shared routes
+# Requests and sharing variants are connected in a compatibility DAG
+# (a trip can follow another one if it can be started in time).
+# The minimum number of vehicles is a minimum path cover of this DAG,
+# solved as min-cost flow, the cost being the empty drive between trips.
+# Choosing which sharing variants to use is not part of the flow: the cover
+# is minimal over the trips of a selection (see minimum_fleet_routes).
+# =============================================================================
+
+
+import heapq
+from bisect import bisect_right
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.logger import log
+from Moving.request import dist_to_cost, COST_PER_DIST
+from Opt.optimizer import (
+    distance_matrices,
+    pack_requests,
+    packed_in_time,
+    routing_with_variants,
+)
+
+
+class FlowNetwork:
+    """
+    directed graph with capacities and costs
+    arcs are stored in pairs: arc e and its reverse arc e ^ 1
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.out = [[] for _ in range(n)]
+        self.head = []
+        self.cap = []
+        self.cost = []
+
+    def add_arc(self, u, v, cap, cost):
+        self.out[u].append(len(self.head))
+        self.head.append(v)
+        self.cap.append(cap)
+        self.cost.append(cost)
+        self.out[v].append(len(self.head))
+        self.head.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+
+    def successive_shortest_path(self, s, t, potential=None):
+        """
+        send as much flow as possible from s to t at minimum cost
+        augments along shortest paths (Dijkstra on reduced costs)
+        potential: feasible node potentials, all 0 if costs are not negative
+        returns (flow, cost)
+        """
+        n = self.n
+        out = self.out
+        head = self.head
+        cap = self.cap
+        cost = self.cost
+        if potential is None:
+            potential = [0] * n
+        inf = float("inf")
+        flow = 0
+        flow_cost = 0
+        while True:
+            dist = [inf] * n
+            via = [-1] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == t:
+                    break
+                pu = potential[u]
+                for e in out[u]:
+                    if cap[e] > 0:
+                        v = head[e]
+                        nd = d + cost[e] + pu - potential[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            via[v] = e
+                            heapq.heappush(heap, (nd, v))
+            dist_t = dist[t]
+            if dist_t == inf:
+                break
+            # keeps reduced costs of all residual arcs non-negative
+            for v in range(n):
+                potential[v] += min(dist[v], dist_t)
+
+            # bottleneck of the augmenting path
+            push = inf
+            v = t
+            while v != s:
+                e = via[v]
+                push = min(push, cap[e])
+                v = head[e ^ 1]
+            v = t
+            while v != s:
+                e = via[v]
+                cap[e] -= push
+                cap[e ^ 1] += push
+                flow_cost += push * cost[e]
+                v = head[e ^ 1]
+            flow += push
+        return (flow, flow_cost)
+
+
+def select_trips(requests, variants):
+    """
+    choose disjoint sharing variants, shortest time span first
+    (short trips are easier to chain)
+    returns list of trips serving every request exactly once
+    """
+
+    def span(v):
+        return v.expected_finish_time - v.expected_start_time
+
+    served = set()
+    trips = []
+    for v in sorted(variants, key=span):
+        if any(i in served for i in v.contains):
+            continue
+        served.update(v.contains)
+        trips.append(v)
+    trips += [r for r in requests if r.idx not in served]
+    return trips
+
+
+def planned_trips(requests, variants, routes):
+    """
+    returns the trips of the routes of Opt.optimizer.routing_with_variants
+    the requests of a shared ride served only in part are single trips,
+    as are the requests not on any route
+    """
+    by_idx = {r.idx: r for r in requests}
+    by_reservations = {tuple(v.reservations): v for v in variants}
+    trips = []
+    for route in routes:
+        for reservations in route.reservations:
+            trip = by_reservations.get(tuple(reservations))
+            if trip is not None:
+                trips.append(trip)
+            else:
+                trips += [by_idx[i] for i in dict.fromkeys(reservations)]
+            for i in reservations:
+                by_idx.pop(i, None)
+    return trips + list(by_idx.values())
+
+
+def compatibility_dag(trips, dist_array, time_array, time_safety_factor, max_wait):
+    """
+    returns the arcs (i, j, cost) between trips sorted by expected start time
+    trip j can follow trip i if it passes the test of Opt.optimizer.predecessor
+    (packed_in_time)
+    cost: empty drive from target of i to start of j
+    max_wait: longest time a vehicle waits for the next trip, None for no limit
+    """
+    plan = pack_requests(trips)
+    starts = plan.start.tolist()
+    bound = time_array.max(axis=0).max() * time_safety_factor if len(trips) else 0
+    arcs = []
+    for i, finish in enumerate(plan.finish.tolist()):
+        first = bisect_right(starts, finish)
+        last = len(trips)
+        if max_wait is not None:
+            last = bisect_right(starts, finish + bound + max_wait)
+        if first >= last:
+            continue
+        js = np.arange(first, last)
+        ok = packed_in_time(plan, time_array, time_safety_factor, i, js)
+        if max_wait is not None:
+            travel_time = time_array[plan.to_idx[i], plan.from_idx[js]]
+            arrival = finish + travel_time * time_safety_factor
+            ok &= plan.start[js] <= arrival + max_wait
+        js = js[ok]
+        dist = dist_array[plan.to_idx[i], plan.from_idx[js]]
+        costs = (dist * COST_PER_DIST).astype(np.int64)
+        arcs += zip([i] * len(js), js.tolist(), costs.tolist())
+    return arcs
+
+
+def trip_reservations(trip):
+    """
+    returns request IDs and reservations served by a trip
+    """
+    if trip.contains:
+        return (list(trip.contains), trip.reservations)
+    # TWO Entries: pickup and drop
+    return ([trip.idx], [trip.idx, trip.idx])
+
+
+def path_cover(start_idx, trips, dist_array, time_array, time_safety_factor, max_wait):
+    """
+    returns (routes, empty drive cost) of the minimum path cover of the trips
+    """
+    trips = sorted(trips, key=lambda r: r.expected_start_time)
+    n = len(trips)
+    arcs = compatibility_dag(
+        trips, dist_array, time_array, time_safety_factor, max_wait
+    )
+    log(f"{n} trips, {len(arcs)} compatible pairs")
+
+    # bipartite network: source 0, trips out 1..n, trips in n+1..2n, sink 2n+1
+    source = 0
+    sink = 2 * n + 1
+    network = FlowNetwork(2 * n + 2)
+    for i in range(n):
+        network.add_arc(source, 1 + i, 1, 0)
+        network.add_arc(1 + n + i, sink, 1, 0)
+    first_arc = len(network.head)
+    for i, j, cost in arcs:
+        network.add_arc(1 + i, 1 + n + j, 1, cost)
+    (_, cost) = network.successive_shortest_path(source, sink)
+
+    # successor of each trip on its route
+    succ = [-1] * n
+    has_pre = [False] * n
+    for k, (i, j, _) in enumerate(arcs):
+        if network.cap[first_arc + 2 * k] == 0:
+            succ[i] = j
+            has_pre[j] = True
+
+    routes = []
+    for i in range(n):
+        if has_pre[i]:
+            continue
+        o = DotDict()
+        o.fullfilled = []
+        o.reservations = []
+        o.sum = 0
+        from_idx = start_idx
+        while i >= 0:
+            trip = trips[i]
+            (fullfilled, reservations) = trip_reservations(trip)
+            o.fullfilled += fullfilled
+            o.reservations.append(reservations)
+            o.sum += trip.value - dist_to_cost(dist_array[from_idx, trip.from_idx])
+            from_idx = trip.to_idx
+            i = succ[i]
+        o.sum = int(o.sum)
+        routes.append(o)
+    return (routes, cost)
+
+
+def minimum_fleet_routes(
+    start_idx, requests, variants, distances, time_safety_factor=1.2, max_wait=None
+):
+    """
+    return list of routes with the minimum number of vehicles
+    each route has (see Opt.optimizer.routing_with_variants):
+    - fullfilled: list of request IDs
+    - sum: value of the route
+    - reservations: list of reservations, early reservations first
+
+    consecutive trips of a route pass the test of Opt.optimizer.predecessor,
+    the path cover is minimal over the trips of one selection, the one with
+    fewer vehicles (then less empty driving) is used:
+    - select_trips(): disjoint variants, shortest time span first
+    - planned_trips(): the trips of routing_with_variants
+    routing_with_variants may need less vehicles: its routes chain a trip
+    to the best route of the requests before its predecessor, also if the
+    last trip of that route does not pass the test
+    a lazy distance oracle (Net.dist_oracle) is not supported:
+    the compatibility DAG needs the times between all trips
+    """
+    if hasattr(distances.time_array, "oracle"):
+        raise ValueError("minimum fleet planner needs the distance matrix, not dist_lazy")
+    dist_array, time_array = distance_matrices(distances)
+    planned = routing_with_variants(
+        start_idx, requests, variants, distances, time_safety_factor
+    )
+    best = None
+    for trips in (
+        select_trips(requests, variants),
+        planned_trips(requests, variants, planned),
+    ):
+        (routes, cost) = path_cover(
+            start_idx, trips, dist_array, time_array, time_safety_factor, max_wait
+        )
+        if best is None or (len(routes), cost) < (len(best[0]), best[1]):
+            best = (routes, cost)
+    routes = best[0]
+    log(f"{len(requests)} requests: {len(routes)} vehicles")
+    return routes
@@ -12,9 +12,17 @@
 # =============================================================================
 
 
+from bisect import bisect_left
+
+import numpy as np
+
 from Tools.dotdict import DotDict
 from Tools.logger import log
-from Moving.request import Request, dist_to_cost
+from Moving.request import Request, dist_to_cost, COST_PER_DIST
+from Opt.variants import VariantTable, padded
+
+# number of requests summarized in one entry of block_min
+BLOCK = 64
 
 
 def value_cost(start_idx, requests, distances, values, j):
@@ -36,141 +44,641 @@ def value_cost(start_idx, requests, distances, values, j):
     return max(1, req.value + pre_value)
 
 
-def predecessor(requests, distances, j, time_safety_factor):
+def max_travel_times(distances):
+    """
+    returns the longest travel time to each POI
+    upper bound for the travel time from any predecessor
+    a lazy time_array (Net.dist_oracle) has no bound: all pairs would be
+    calculated, the predecessors are tested one by one instead
+    """
+    if hasattr(distances.time_array, "oracle"):
+        return [float("inf")] * len(distances.time_array)
+    return [max(column) for column in zip(*distances.time_array)]
+
+
+def predecessor_index(requests, distances, time_safety_factor, max_travel=None):
+    """
+    precompute the search index for predecessor():
+    - finish: expected finish time of each request
+    - max_finish: running maximum of finish (sorted, used with bisect)
+    - block_min: minimum of finish for each BLOCK of requests
+    - bound: safety weighted upper bound of travel time to each POI
+    """
+    if max_travel is None:
+        max_travel = max_travel_times(distances)
+    index = DotDict()
+    index.finish = [r.expected_finish_time for r in requests]
+    index.max_finish = []
+    latest = float("-inf")
+    for f in index.finish:
+        latest = max(latest, f)
+        index.max_finish.append(latest)
+    index.block_min = [
+        min(index.finish[k : k + BLOCK]) for k in range(0, len(requests), BLOCK)
+    ]
+    index.bound = [t * time_safety_factor for t in max_travel]
+    return index
+
+
+def in_time(req_pre, req, distances, time_safety_factor):
+    """
+    returns True if req can be started after req_pre is finished
+    consider time to travel from target of predecessor to start of req
+    """
+    from_idx = req_pre.to_idx  # target of predecessor
+    to_idx = req.from_idx  # start of request
+    travel_time = distances.time_array[from_idx][to_idx]
+    return (
+        req.expected_start_time
+        > req_pre.expected_finish_time + travel_time * time_safety_factor
+    )
+
+
+def predecessor(requests, distances, j, time_safety_factor, index=None, last=None):
     """
     find predecessor of the request with index j
     consider time to travel from target of predecessor to start of req
     store predecessor index in requests
+
+    with an index (see predecessor_index) only the time window of requests
+    that may or may not be reached in time is checked against the matrix
+    last: highest index to consider, default j - 1
     """
 
     req = requests[j]
     req.pre = -1
-    for i in range(j - 1, -1, -1):
-        req_pre = requests[i]
-        from_idx = req_pre.to_idx  # target of predecessor
-        to_idx = req.from_idx  # start of request
-        travel_time = distances.time_array[from_idx][to_idx]
-        if (
-            req.expected_start_time
-            > req_pre.expected_finish_time + travel_time * time_safety_factor
-        ):
-            req.pre = i
-            return
+    if last is None:
+        last = j - 1
+    if index is None:
+        for i in range(last, -1, -1):
+            if in_time(requests[i], req, distances, time_safety_factor):
+                req.pre = i
+                return
+        return
+
+    start = req.expected_start_time
+    finish = index.finish
+    max_finish = index.max_finish
+    bound = index.bound[req.from_idx]
+
+    # requests 0..lo finish in time even with the longest travel time
+    lo = min(bisect_left(max_finish, start - bound), last + 1) - 1
+    while lo >= 0 and max_finish[lo] + bound >= start:
+        lo -= 1
+
+    time_array = distances.time_array
+    block_min = index.block_min
+    to_idx = req.from_idx  # start of request
+    i = last
+    while i > lo:
+        b = i // BLOCK
+        if block_min[b] >= start:
+            # no request of this block finishes before the start
+            i = b * BLOCK - 1
+            continue
+        f = finish[i]
+        if f < start:
+            # travel time is never negative, so f >= start is never in time
+            if f + bound < start:
+                req.pre = i
+                return
+            travel_time = time_array[requests[i].to_idx][to_idx]
+            if start > f + travel_time * time_safety_factor:
+                req.pre = i
+                return
+        i -= 1
+    req.pre = lo
 
 
-def find_opt(start_idx, requests, distances, values, j):
+def find_opt(pre, take, value_costs, n):
     """
     returns list of indices of fullfilled requests
+    walks back from request n using the take/skip decisions
+    stored during the forward pass (no recursion)
+    pre: predecessor index of each request
     """
     indices = []
     value = 0
-    vc = value_cost(start_idx, requests, distances, values, j)
-    if j == 0:
-        pass
-    elif vc > values[j - 1]:
-        value += vc
-        indices += [j - 1]
-        (i, v) = find_opt(
-            start_idx, requests, distances, values, requests[j - 1].pre + 1
-        )
-        indices += i
-        value += v
-    else:
-        (i, v) = find_opt(start_idx, requests, distances, values, j - 1)
-        indices += i
-        value += v
+    j = n
+    while j > 0:
+        if take[j]:
+            value += value_costs[j]
+            indices.append(j - 1)
+            j = int(pre[j - 1]) + 1
+        else:
+            j -= 1
 
     return (indices, value)
 
 
-def one_optimal_route(start_idx, requests, distances, time_safety_factor=1.2):
+def forward_pass(start_idx, requests, distances, dp, first=1):
     """
-    find one optimal route between requests
+    compute the best values of the requests first - 1 .. n - 1
+    dp.best_values[j]: best value of the first j requests
+    dp.take[j]: request j - 1 is part of the best route of the first j requests
+    dp.value_costs[j]: value of request j - 1 including its predecessor chain
+    entries before first are kept
     """
     n = len(requests)
+    values = dp.best_values
+    take = dp.take
+    value_costs = dp.value_costs
+    for j in range(first, n + 1):
+        v = value_cost(start_idx, requests, distances, values, j)
+        value_costs[j] = v
+        if v > values[j - 1]:
+            values[j] = v
+            take[j] = True
+        else:
+            values[j] = values[j - 1]
+            take[j] = False
 
-    for j in range(n - 1, -1, -1):
-        predecessor(requests, distances, j, time_safety_factor)
 
-    values = [0 for _ in range(n + 1)]
-    for j in range(1, n + 1):
-        v = value_cost(start_idx, requests, distances, values, j)
-        values[j] = max(v, values[j - 1])
+def dp_arrays(n):
+    """
+    preallocated arrays for forward_pass()
+    """
+    dp = DotDict()
+    dp.best_values = [0] * (n + 1)
+    dp.take = [False] * (n + 1)
+    dp.value_costs = [0] * (n + 1)
+    return dp
 
-    (indices, value) = find_opt(start_idx, requests, distances, values, n)
 
+def route_reservations(requests, indices):
+    """
+    returns list of fullfilled request IDs and reservations
+    of the requests with the given indices
+    """
     fullfilled = []
+    # set of fullfilled request IDs for constant time lookups
+    done = set()
     reservations = []
     for j in indices:
         req: Request = requests[j]
         # if the fullfilled request is a shared ride:
         #  append the original requests to fullfilled
         if req.contains:
-            if req.idx not in fullfilled:
+            if req.idx not in done:
                 fullfilled.append(req.idx)
-            reqidx0 = req.contains[0]
-            reqidx1 = req.contains[1]
-            if reqidx0 not in fullfilled and reqidx1 not in fullfilled:
-                fullfilled.append(reqidx0)
-                fullfilled.append(reqidx1)
-                reservations.append(req.reservations)
-            elif reqidx0 not in fullfilled:
-                fullfilled.append(reqidx0)
-                reservations.append([reqidx0, reqidx0])
-            elif reqidx1 not in fullfilled:
-                fullfilled.append(reqidx1)
-                reservations.append([reqidx1, reqidx1])
-        elif req.idx not in fullfilled:
+                done.add(req.idx)
+            # requests of the shared ride not yet fullfilled
+            # keep their order of the shared ride
+            open_idx = [i for i in req.contains if i not in done]
+            if open_idx:
+                fullfilled += open_idx
+                done.update(open_idx)
+                reservations.append([i for i in req.reservations if i in open_idx])
+        elif req.idx not in done:
             # TWO Entries: pickup and drop
             fullfilled.append(req.idx)
+            done.add(req.idx)
             reservations.append([req.idx, req.idx])
         log(
-            f"{req.idx:3d} {req.submit_time:4d} {req.latest_finish_time:4d} {reservations}"
+            f"{req.idx:3d} {req.submit_time:4d} {req.latest_finish_time:4d} {reservations[-1:]}"
         )
 
     # req_indices = [r.idx for r in requests]
     log(f"{len(requests):} requests: {len(fullfilled)} fullfilled")
 
     # reversal of list: early reservations first
-    return (fullfilled, value, list(reversed(reservations)))
+    return (fullfilled, list(reversed(reservations)))
+
+
+def one_optimal_route(
+    start_idx, requests, distances, time_safety_factor=1.2, max_travel=None
+):
+    """
+    find one optimal route between requests
+    max_travel: see max_travel_times(), computed if not given
+    """
+    n = len(requests)
+
+    index = predecessor_index(requests, distances, time_safety_factor, max_travel)
+    for j in range(n - 1, -1, -1):
+        predecessor(requests, distances, j, time_safety_factor, index)
+
+    dp = dp_arrays(n)
+    forward_pass(start_idx, requests, distances, dp)
+
+    pre = [r.pre for r in requests]
+    (indices, value) = find_opt(pre, dp.take, dp.value_costs, n)
+    (fullfilled, reservations) = route_reservations(requests, indices)
+    return (fullfilled, value, reservations)
+
+
+def remove_fullfilled(
+    start_idx, requests, distances, dp, fullfilled, time_safety_factor, max_travel
+):
+    """
+    remove fullfilled requests and all variants containing them
+    repair predecessors and values after the first removed request
+    returns the remaining requests
+    """
+    done = set(fullfilled)
+    remaining = []
+    # number of remaining requests before each old index
+    kept_before = []
+    first = None
+    for r in requests:
+        kept_before.append(len(remaining))
+        if r.idx in done or (r.contains and any(i in done for i in r.contains)):
+            if first is None:
+                first = len(remaining)
+            continue
+        remaining.append(r)
+    n = len(remaining)
+    if first is None:
+        first = n
+
+    index = predecessor_index(remaining, distances, time_safety_factor, max_travel)
+    for j in range(first, n):
+        req = remaining[j]
+        pre = req.pre
+        if pre < 0:
+            # nothing was reachable before, less requests do not change this
+            continue
+        new_pre = kept_before[pre]
+        if new_pre < n and remaining[new_pre] is requests[pre]:
+            req.pre = new_pre
+        else:
+            # all requests between pre and j were not reachable in time
+            predecessor(
+                remaining, distances, j, time_safety_factor, index, last=new_pre - 1
+            )
+
+    # values of the unchanged requests before first stay valid
+    del dp.best_values[n + 1 :]
+    del dp.take[n + 1 :]
+    del dp.value_costs[n + 1 :]
+    forward_pass(start_idx, remaining, distances, dp, first + 1)
+    return remaining
+
+
+# =============================================================================
+# Vectorized planning: the sorted requests are packed into parallel arrays,
+# predecessors and travel costs are computed with NumPy fancy indexing into
+# the distance matrices. Only the DP recurrence remains a Python loop.
+# =============================================================================
+
+# requests evaluated at once in packed_predecessors
+BATCH = 8192
+
+# per request arrays of a plan, compressed when requests are removed
+PACKED = ["from_idx", "to_idx", "start", "finish", "value", "idx", "contains", "row"]
+
+
+def distance_matrices(distances):
+    """
+    returns dist_array and time_array as NumPy arrays
+    not for a lazy distance oracle (Net.dist_oracle), it is never densified
+    """
+    if hasattr(distances.time_array, "oracle"):
+        raise ValueError("distance matrix needed, not a lazy distance oracle (dist_lazy)")
+    dist_array = np.asarray(distances.dist_array, dtype=np.float64)
+    time_array = np.asarray(distances.time_array, dtype=np.float64)
+    return dist_array, time_array
+
+
+def pack_requests(requests):
+    """
+    returns the requests (list or VariantTable) as parallel arrays
+    contains: one row per request, -1 if not a shared ride
+    """
+    if isinstance(requests, VariantTable):
+        return requests.pack()
+    n = len(requests)
+    plan = DotDict()
+    plan.from_idx = np.fromiter((r.from_idx for r in requests), np.intp, n)
+    plan.to_idx = np.fromiter((r.to_idx for r in requests), np.intp, n)
+    plan.start = np.fromiter((r.expected_start_time for r in requests), np.float64, n)
+    plan.finish = np.fromiter((r.expected_finish_time for r in requests), np.float64, n)
+    plan.latest = np.fromiter((r.latest_finish_time for r in requests), np.float64, n)
+    plan.value = np.fromiter((r.value for r in requests), np.int64, n)
+    plan.idx = np.fromiter((r.idx for r in requests), np.int64, n)
+    width = max((len(r.contains) for r in requests if r.contains), default=0)
+    plan.contains = np.full((n, width), -1, dtype=np.int64)
+    for j, r in enumerate(requests):
+        if r.contains:
+            plan.contains[j, : len(r.contains)] = r.contains
+    return plan
+
+
+def finish_index(plan):
+    """
+    vectorized predecessor_index():
+    - max_finish: running maximum of finish (sorted, used with searchsorted)
+    - block_min: minimum of finish for each BLOCK of requests
+    """
+    plan.max_finish = np.maximum.accumulate(plan.finish)
+    if len(plan.finish):
+        plan.block_min = np.minimum.reduceat(
+            plan.finish, np.arange(0, len(plan.finish), BLOCK)
+        )
+    else:
+        plan.block_min = plan.finish
+
+
+def packed_in_time(plan, time_array, time_safety_factor, pre, js):
+    """
+    vectorized in_time(): request js can be started after request pre is finished
+    pre, js: index arrays into the plan, broadcast against each other
+    """
+    travel_time = time_array[plan.to_idx[pre], plan.from_idx[js]]
+    return plan.start[js] > plan.finish[pre] + travel_time * time_safety_factor
+
+
+def packed_predecessors(plan, time_array, time_safety_factor, bound, js, last):
+    """
+    vectorized predecessor() for the requests js
+    last: highest index to consider for each request
+    returns predecessor index of each request, -1 if none
+    """
+    start = plan.start[js]
+    to_start = plan.from_idx[js]
+    max_travel = bound[to_start]
+    max_finish = plan.max_finish
+
+    # requests 0..lo finish in time even with the longest travel time
+    lo = np.minimum(np.searchsorted(max_finish, start - max_travel), last + 1) - 1
+    late = (lo >= 0) & (max_finish[lo] + max_travel >= start)
+    while late.any():
+        lo[late] -= 1
+        late = (lo >= 0) & (max_finish[lo] + max_travel >= start)
+
+    pre = lo.copy()
+    hi = np.array(last, dtype=np.intp)
+    steps = np.arange(BLOCK)
+    open_rows = np.flatnonzero(hi > lo)
+    for k in range(0, open_rows.size, BATCH):
+        rows = open_rows[k : k + BATCH]
+        while rows.size:
+            # candidates from hi down to the begin of its block
+            block = hi[rows] // BLOCK
+            begin = block * BLOCK
+            # no request of the block finishes before the start
+            skip = plan.block_min[block] >= start[rows]
+            check = rows[~skip]
+            cand = hi[check, None] - steps
+            valid = (cand >= begin[~skip, None]) & (cand > lo[check, None])
+            cand = np.where(valid, cand, 0)
+            ok = valid & packed_in_time(
+                plan, time_array, time_safety_factor, cand, js[check, None]
+            )
+            hit = ok.any(axis=1)
+            pre[check[hit]] = cand[hit, ok[hit].argmax(axis=1)]
+            # continue with the previous block
+            hi[rows] = begin - 1
+            resolved = np.zeros(rows.size, dtype=bool)
+            resolved[np.flatnonzero(~skip)[hit]] = True
+            rows = rows[~resolved & (hi[rows] > lo[rows])]
+    return pre
+
+
+def packed_costs(start_idx, plan, dist_array, pre, js):
+    """
+    vectorized travel cost from the target of the predecessor
+    (or the start) to the start of the requests js
+    """
+    source = np.where(pre >= 0, plan.to_idx[pre], start_idx)
+    dist = dist_array[source, plan.from_idx[js]]
+    return (dist * COST_PER_DIST).astype(np.int64)
+
+
+def packed_forward_pass(plan, first=1):
+    """
+    forward_pass() on a packed plan
+    """
+    n = len(plan.value)
+    value = plan.value.tolist()
+    pre = plan.pre.tolist()
+    cost = plan.cost.tolist()
+    dp = plan.dp
+    values = dp.best_values
+    take = dp.take
+    value_costs = dp.value_costs
+    for j in range(first, n + 1):
+        p = pre[j - 1]
+        if p > -1:
+            v = value[j - 1] + (values[p + 1] - cost[j - 1])
+        else:
+            v = value[j - 1] - cost[j - 1]
+        # do not return negative cost
+        if v < 1:
+            v = 1
+        value_costs[j] = v
+        if v > values[j - 1]:
+            values[j] = v
+            take[j] = True
+        else:
+            values[j] = values[j - 1]
+            take[j] = False
+
+
+def pack_sorted(requests, variants):
+    """
+    pack requests and variants sorted by latest finish time
+    row: position in requests + variants
+    """
+    plans = [pack_requests(requests), pack_requests(variants)]
+    width = max(p.contains.shape[1] for p in plans)
+    for p in plans:
+        p.contains = padded(p.contains, width)
+    plan = DotDict()
+    latest = np.concatenate([p.latest for p in plans])
+    # stable: same order as sorted() of the request objects
+    plan.row = np.argsort(latest, kind="stable")
+    for key in PACKED:
+        if key != "row":
+            plan[key] = np.concatenate([p[key] for p in plans])[plan.row]
+    return plan
+
+
+def packed_plan(start_idx, plan, dist_array, time_array, time_safety_factor, bound):
+    """
+    compute predecessors, costs and values of the packed requests
+    bound: safety weighted upper bound of travel time to each POI
+    """
+    n = len(plan.idx)
+    finish_index(plan)
+    js = np.arange(n)
+    plan.pre = packed_predecessors(
+        plan, time_array, time_safety_factor, bound, js, js - 1
+    )
+    plan.cost = packed_costs(start_idx, plan, dist_array, plan.pre, js)
+    plan.dp = dp_arrays(n)
+    packed_forward_pass(plan)
+    return plan
+
+
+def packed_remove_fullfilled(
+    start_idx,
+    plan,
+    fullfilled,
+    dist_array,
+    time_array,
+    time_safety_factor,
+    bound,
+):
+    """
+    remove_fullfilled() on a packed plan
+    """
+    done = np.fromiter(set(fullfilled), np.int64)
+    removed = np.isin(plan.idx, done)
+    if plan.contains.shape[1]:
+        removed |= np.isin(plan.contains, done).any(axis=1)
+    keep = ~removed
+    n = int(keep.sum())
+    removed_at = np.flatnonzero(removed)
+    first = int(removed_at[0]) if removed_at.size else n
+
+    # number of remaining requests before each old index
+    kept_before = np.cumsum(keep) - keep
+    old_pre = plan.pre[keep]
+    for key in PACKED:
+        plan[key] = plan[key][keep]
+    finish_index(plan)
+    plan.cost = plan.cost[keep]
+
+    pre = np.where(old_pre >= 0, kept_before[old_pre], -1)
+    # all requests between a removed predecessor and j were not reachable
+    js = np.flatnonzero((old_pre >= 0) & removed[old_pre])
+    if js.size:
+        pre[js] = packed_predecessors(
+            plan, time_array, time_safety_factor, bound, js, pre[js] - 1
+        )
+        plan.cost[js] = packed_costs(start_idx, plan, dist_array, pre[js], js)
+    plan.pre = pre
+
+    # values of the unchanged requests before first stay valid
+    dp = plan.dp
+    del dp.best_values[n + 1 :]
+    del dp.take[n + 1 :]
+    del dp.value_costs[n + 1 :]
+    packed_forward_pass(plan, first + 1)
+
+
+def packed_routing(start_idx, requests, variants, distances, time_safety_factor):
+    """
+    routing_with_variants() on a packed plan
+    variants: list of variant requests or VariantTable,
+    only the variants of the routes are created as requests
+    """
+    routes = []
+    no_variants = set(r.idx for r in requests)
+    plan = pack_sorted(requests, variants)
+    if not len(plan.idx):
+        return routes
+
+    nreq = len(requests)
+    dist_array, time_array = distance_matrices(distances)
+    # travel time bounds depend on the distances only
+    bound = time_array.max(axis=0) * time_safety_factor
+    packed_plan(start_idx, plan, dist_array, time_array, time_safety_factor, bound)
+    while len(plan.idx):
+        o = DotDict()
+        (indices, o.sum) = find_opt(
+            plan.pre, plan.dp.take, plan.dp.value_costs, len(plan.idx)
+        )
+        rows = plan.row[indices].tolist()
+        trips = [requests[k] if k < nreq else variants[k - nreq] for k in rows]
+        (fullfilled, o.reservations) = route_reservations(trips, range(len(trips)))
+        # store only original requests, not variants
+        o.fullfilled = [i for i in fullfilled if i in no_variants]
+        routes.append(o)
+        packed_remove_fullfilled(
+            start_idx,
+            plan,
+            fullfilled,
+            dist_array,
+            time_array,
+            time_safety_factor,
+            bound,
+        )
+    return routes
 
 
 def routing_with_variants(
-    start_idx, requests, variants, distances, time_safety_factor=1.2
+    start_idx,
+    requests,
+    variants,
+    distances,
+    time_safety_factor=1.2,
+    incremental=True,
+    vectorized=True,
 ):
     """
     return list of routes
     each route has:
     - fullfilled: list of request IDs
+
+    variants: list of variant requests or VariantTable
+    incremental: repair predecessors and values after removing the
+    fullfilled requests instead of optimizing from scratch for each route
+    vectorized: use the packed NumPy plan for the incremental planning,
+    not with a lazy distance oracle (Net.dist_oracle): its times are
+    calculated for the tested pairs only
     """
+    lazy = hasattr(distances.time_array, "oracle")
+    if incremental and vectorized and not lazy:
+        return packed_routing(
+            start_idx, requests, variants, distances, time_safety_factor
+        )
+
     routes = []
 
     # indices of original requests
-    no_variants = [r.idx for r in requests]
+    no_variants = set(r.idx for r in requests)
 
     # rv: list of requests and request variants
-    rv = requests.copy() + variants
+    rv = requests.copy() + list(variants)
     rv = sorted(rv, key=lambda r: r.latest_finish_time)
 
+    if not rv:
+        return routes
+
+    # travel time bounds depend on the distances only
+    max_travel = max_travel_times(distances)
+
+    if incremental:
+        n = len(rv)
+        index = predecessor_index(rv, distances, time_safety_factor, max_travel)
+        for j in range(n - 1, -1, -1):
+            predecessor(rv, distances, j, time_safety_factor, index)
+        dp = dp_arrays(n)
+        forward_pass(start_idx, rv, distances, dp)
+
     while len(rv):
         o = DotDict()
-        (fullfilled, o.sum, o.reservations) = one_optimal_route(
-            start_idx, rv, distances, time_safety_factor
-        )
+        if incremental:
+            pre = [r.pre for r in rv]
+            (indices, o.sum) = find_opt(pre, dp.take, dp.value_costs, len(rv))
+            (fullfilled, o.reservations) = route_reservations(rv, indices)
+        else:
+            (fullfilled, o.sum, o.reservations) = one_optimal_route(
+                start_idx, rv, distances, time_safety_factor, max_travel
+            )
         # store only original requests, not variants
         o.fullfilled = [i for i in fullfilled if i in no_variants]
         routes.append(o)
-        next_rv = []
         # clear list of open requests
         # rm all requests that are fullfilled
-        for r in rv:
-            if r.idx in fullfilled:
-                continue
-            if r.contains:
-                if r.contains[0] in fullfilled:
-                    continue
-                if r.contains[1] in fullfilled:
-                    continue
-            next_rv.append(r)
-        rv = next_rv
+        if incremental:
+            rv = remove_fullfilled(
+                start_idx,
+                rv,
+                distances,
+                dp,
+                fullfilled,
+                time_safety_factor,
+                max_travel,
+            )
+        else:
+            done = set(fullfilled)
+            rv = [
+                r
+                for r in rv
+                if r.idx not in done
+                and not (r.contains and any(i in done for i in r.contains))
+            ]
     return routes
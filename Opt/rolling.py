@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides a rolling horizon planner for shared routes
+# Requests are planned in windows of their submit time: at the end of
+# each window the requests submitted in the window are shared and routed.
+# Requests whose pickup is already due are shifted to the end of the window.
+# The new routes are appended to the vehicles planned in earlier windows
+# (committed trips are never changed) or start new vehicles.
+# =============================================================================
+
+import copy
+
+from Tools.dotdict import DotDict
+from Tools.logger import log
+from Opt.optimizer import routing_with_variants, in_time
+from Opt.sharing import sharing, SPEED
+
+
+def not_before(request, t):
+    """
+    returns the request if its pickup is not before t, else a copy
+    with start and finish times shifted to start at t
+    """
+    shift = t - request.expected_start_time
+    if shift <= 0:
+        return request
+    request = copy.copy(request)
+    request.expected_start_time += shift
+    request.expected_finish_time += shift
+    request.latest_finish_time += shift
+    return request
+
+
+class RollingHorizonPlanner:
+    """
+    plans the requests window by window
+    - window: length of the planning window in seconds (submit time)
+    - vehicles: list of planned vehicles, same format as the routes of
+      Opt.optimizer.routing_with_variants plus the last planned trip
+    """
+
+    def __init__(
+        self,
+        distances,
+        speed=SPEED,
+        time_safety_factor=1.2,
+        window=300,
+        start_idx=0,
+        max_riders=2,
+    ):
+        self.distances = distances
+        self.speed = speed
+        self.time_safety_factor = time_safety_factor
+        self.window = window
+        self.start_idx = start_idx
+        self.max_riders = max_riders
+        self.vehicles = []
+        # end of the last planned window and of the next window to be planned
+        self.last_end = float("-inf")
+        self.next_time = window
+
+    def window_requests(self, requests, t):
+        """
+        returns the requests submitted after the last planned window and before t
+        """
+        return [r for r in requests if self.last_end <= r.submit_time < t]
+
+    def due(self, requests, t):
+        """
+        returns True if the window ending at t is to be planned:
+        the window is over or all open requests are submitted before t
+        """
+        if t >= self.next_time:
+            return True
+        open_times = [r.submit_time for r in requests if r.submit_time >= self.last_end]
+        return bool(open_times) and max(open_times) < t
+
+    def plan(self, requests, t):
+        """
+        plan the requests submitted in the window ending at t
+        requests with pickup before t are planned to start at t
+        returns list of (vehicle index, new reservations)
+        """
+        window_requests = [not_before(r, t) for r in self.window_requests(requests, t)]
+        self.last_end = t
+        self.next_time = t + self.window
+        if not window_requests:
+            return []
+        tsf = self.time_safety_factor
+        variants = sharing(
+            window_requests,
+            self.distances,
+            self.speed / tsf,
+            max_riders=self.max_riders,
+        )
+        routes = routing_with_variants(
+            self.start_idx, window_requests, variants, self.distances, tsf
+        )
+
+        # map reservations of a trip to the trip (request or sharing variant)
+        # rest of a shared ride: first and last request
+        by_idx = {r.idx: r for r in window_requests}
+        trips = {tuple(v.reservations): v for v in variants}
+
+        assigned = []
+        for route in routes:
+            first = route.reservations[0]
+            first = trips.get(tuple(first), by_idx[first[0]])
+            last = route.reservations[-1]
+            last = trips.get(tuple(last), by_idx[last[-1]])
+            i = self.free_vehicle(first)
+            if i is None:
+                i = len(self.vehicles)
+                o = DotDict()
+                o.fullfilled = []
+                o.reservations = []
+                o.sum = 0
+                self.vehicles.append(o)
+            vehicle = self.vehicles[i]
+            vehicle.fullfilled += route.fullfilled
+            vehicle.reservations += route.reservations
+            vehicle.sum += route.sum
+            vehicle.last = last
+            assigned.append((i, route.reservations))
+        log(
+            f"t={t}: {len(window_requests)} requests in {len(routes)} routes, "
+            f"{len(self.vehicles)} vehicles"
+        )
+        return assigned
+
+    def free_vehicle(self, trip):
+        """
+        returns index of the vehicle with the shortest empty drive
+        which can start the trip in time, None if there is none
+        """
+        best = None
+        best_time = None
+        time_array = self.distances.time_array
+        for i, vehicle in enumerate(self.vehicles):
+            last = vehicle.last
+            if not in_time(last, trip, self.distances, self.time_safety_factor):
+                continue
+            empty_time = time_array[last.to_idx][trip.from_idx]
+            if best is None or empty_time < best_time:
+                best = i
+                best_time = empty_time
+        return best
+
+    def routes(self):
+        """
+        returns the planned vehicles as routes
+        """
+        return self.vehicles
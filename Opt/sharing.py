@@ -22,10 +22,15 @@ from Tools.dotdict import DotDict
 
 import copy
 
+import numpy as np
+
+from Opt.variants import VariantTable
+
 SPEED = 0.1
 LATENESS = 2
 COST_PER_DIST = 1
 VALUE_PER_DIST = COST_PER_DIST * 10
+BATCH = 65536  # number of candidate pairs tested at once
 
 
 def dist_to_cost(d):
@@ -78,56 +83,26 @@ def share_ride(requests, distances, i, j, speed=SPEED):
     """
     req = requests[j]
     s1 = req.expected_start_time
-    i1 = req.idx
 
     req_pre = requests[i]
     s2 = req_pre.expected_start_time
     l2 = req_pre.latest_finish_time
-    i2 = req_pre.idx
     if l2 < s1:
         # req_pre ends before req starts
         return None
     elif s2 > s1:
         # full time overlap; s1, s2, f2, f1
 
-        # default dist s1 -> f1
-        default_dist = distances.dist_array[req.from_idx][req.to_idx]
-
         # dist s1 -> s2 -> f2 -> f1
         new_route = [req.from_idx, req_pre.from_idx, req_pre.to_idx, req.to_idx]
-        reservation_order = [req.idx, req_pre.idx, req_pre.idx, req.idx]
-
-        gross_dist, new_route = shrink_multi_step_distance(distances, new_route)
-        detour_dist = gross_dist - default_dist
-        detour_cost = dist_to_cost(detour_dist)
-        added_value = req_pre.value - detour_cost
+        gross_dist, _ = shrink_multi_step_distance(distances, new_route)
 
         tt = dist_to_time(gross_dist, speed)
         if req.expected_start_time + tt < req.latest_finish_time:
-            r = copy.copy(req)
-            r.value += added_value
-            r.contains = [i1, i2]
-            r.path = new_route
-            r.reservations = reservation_order
-            return r
+            return shared_variant(requests, distances, i, j)
     else:
         # partial time overlap s2 s1 f2 f1
 
-        # default dist s1 -> f1
-        dd1 = distances.dist_array[req.from_idx][req.to_idx]
-
-        # default dist s2 -> f2
-        dd2 = distances.dist_array[req_pre.from_idx][req_pre.to_idx]
-
-        # dist s2 -> s1 -> f2 -> f1
-        new_route = [req_pre.from_idx, req.from_idx, req_pre.to_idx, req.to_idx]
-        reservation_order = [req_pre.idx, req.idx, req_pre.idx, req.idx]
-
-        gross_dist, new_route = shrink_multi_step_distance(distances, new_route)
-        detour_dist = gross_dist - dd1 - dd2
-        detour_cost = dist_to_cost(detour_dist)
-        added_value = req_pre.value - detour_cost
-
         detour1 = [req_pre.from_idx, req.from_idx, req_pre.to_idx]
         d1, _ = shrink_multi_step_distance(distances, detour1)
         tt1 = dist_to_time(d1, speed)
@@ -140,38 +115,451 @@ def share_ride(requests, distances, i, j, speed=SPEED):
             req.expected_start_time + tt2 < req.latest_finish_time
             and req_pre.expected_start_time + tt1 < req_pre.latest_finish_time
         ):
-            r = copy.copy(req)
-            r.expected_start_time = req_pre.expected_start_time
-            r.from_idx = req_pre.from_idx
-            r.value += added_value
-            r.contains = [i1, i2]
-            r.path = new_route
-            r.reservations = reservation_order
-            return r
+            return shared_variant(requests, distances, i, j)
     return None
 
 
-def find_share_ride(requests, variants, distances, j, speed=SPEED):
+def dist_matrix(distances):
+    """
+    dist_array as NumPy array
+    a lazy dist_array (Net.dist_oracle) is kept, it takes index arrays too
+    """
+    if hasattr(distances.dist_array, "oracle"):
+        return distances.dist_array
+    return np.asarray(distances.dist_array, dtype=float)
+
+
+def overlap_index(requests, distances=None, max_dist=None):
+    """
+    time window index of the requests for a sweep over the start times
+    - order: request indices sorted by expected start time
+    - sorted_start: expected start times in this order
+    - max_window: longest time window (latest finish - expected start)
+    - ascending: requests sorted by expected start time
+    max_dist: longest distance between the pickups of two shared requests
+    """
+    index = DotDict()
+    index.start = np.array([r.expected_start_time for r in requests], dtype=float)
+    index.latest = np.array([r.latest_finish_time for r in requests], dtype=float)
+    index.order = np.argsort(index.start, kind="stable")
+    index.sorted_start = index.start[index.order]
+    windows = index.latest - index.start
+    index.max_window = max(windows.max(), 0) if len(requests) else 0
+    index.ascending = bool(np.all(index.start[1:] >= index.start[:-1]))
+    index.max_dist = max_dist
+    if max_dist is not None:
+        index.from_idx = np.array([r.from_idx for r in requests], dtype=np.int64)
+        index.dist_array = dist_matrix(distances)
+    return index
+
+
+def sharing_candidates(index, j):
+    """
+    returns indices i < j (descending) of the requests whose latest finish
+    is not before the start of request j, share_ride rejects the other pairs
+    requests sorted by expected start time (index.ascending): i < j implies
+    start[i] <= latest[j], the sweep stops there; else all later starts
+    max_dist: the pairs with pickups farther apart are skipped as well
+    """
+    start = index.start[j]
+    latest = index.latest[j]
+    # latest[i] >= start implies start[i] >= start - max_window
+    lo = np.searchsorted(index.sorted_start, start - index.max_window, "left")
+    hi = len(index.order)
+    if index.ascending:
+        hi = np.searchsorted(index.sorted_start, latest, "right")
+    candidates = index.order[lo:hi]
+    candidates = candidates[(candidates < j) & (index.latest[candidates] >= start)]
+    if index.max_dist is not None:
+        # the detour drives from the first pickup to the other one
+        from_j = index.from_idx[j]
+        from_i = index.from_idx[candidates]
+        dist = np.where(
+            index.start[candidates] > start,
+            index.dist_array[from_j, from_i],
+            index.dist_array[from_i, from_j],
+        )
+        candidates = candidates[dist <= index.max_dist]
+    return np.sort(candidates)[::-1].tolist()
+
+
+def shared_variant(requests, distances, i, j):
+    """
+    returns the variant request of the feasible pair i, j
+    (share_ride without the feasibility test)
+    """
+    req = requests[j]
+    req_pre = requests[i]
+    r = copy.copy(req)
+    if req_pre.expected_start_time > req.expected_start_time:
+        # full time overlap; s1, s2, f2, f1
+        new_route = [req.from_idx, req_pre.from_idx, req_pre.to_idx, req.to_idx]
+        r.reservations = [req.idx, req_pre.idx, req_pre.idx, req.idx]
+        gross_dist, r.path = shrink_multi_step_distance(distances, new_route)
+        detour_dist = gross_dist - distances.dist_array[req.from_idx][req.to_idx]
+    else:
+        # partial time overlap s2 s1 f2 f1
+        new_route = [req_pre.from_idx, req.from_idx, req_pre.to_idx, req.to_idx]
+        r.reservations = [req_pre.idx, req.idx, req_pre.idx, req.idx]
+        gross_dist, r.path = shrink_multi_step_distance(distances, new_route)
+        detour_dist = (
+            gross_dist
+            - distances.dist_array[req.from_idx][req.to_idx]
+            - distances.dist_array[req_pre.from_idx][req_pre.to_idx]
+        )
+        r.expected_start_time = req_pre.expected_start_time
+        r.from_idx = req_pre.from_idx
+    r.value += req_pre.value - dist_to_cost(detour_dist)
+    r.contains = [req.idx, req_pre.idx]
+    return r
+
+
+def pack_sharing(requests, distances):
+    """
+    returns the requests as parallel arrays for share_rides
+    """
+    packed = DotDict()
+    packed.from_idx = np.array([r.from_idx for r in requests], dtype=np.int64)
+    packed.to_idx = np.array([r.to_idx for r in requests], dtype=np.int64)
+    packed.start = np.array([r.expected_start_time for r in requests], dtype=float)
+    packed.latest = np.array([r.latest_finish_time for r in requests], dtype=float)
+    packed.finish = np.array([r.expected_finish_time for r in requests], dtype=float)
+    packed.value = np.array([r.value for r in requests], dtype=np.int64)
+    packed.idx = np.array([r.idx for r in requests], dtype=np.int64)
+    packed.dist_array = dist_matrix(distances)
+    return packed
+
+
+def route_distance(dist_array, *stops):
+    """
+    vectorized shrink_multi_step_distance: stops are index arrays,
+    steps between equal stops are skipped
+    """
+    d = np.zeros(len(stops[0]))
+    from_idx = stops[0]
+    for to_idx in stops[1:]:
+        d += np.where(to_idx != from_idx, dist_array[from_idx, to_idx], 0.0)
+        from_idx = to_idx
+    return d
+
+
+def share_rides(packed, i, j, speed=SPEED):
+    """
+    batched feasibility test of share_ride for the pairs (i[k], j[k])
+    returns boolean mask of the pairs with a sharing variant
+    """
+    dist_array = packed.dist_array
+    fi = packed.from_idx[i]
+    ti = packed.to_idx[i]
+    fj = packed.from_idx[j]
+    tj = packed.to_idx[j]
+    s1 = packed.start[j]
+    l1 = packed.latest[j]
+    s2 = packed.start[i]
+    l2 = packed.latest[i]
+
+    # full time overlap: s1 -> s2 -> f2 -> f1
+    tt = np.trunc(route_distance(dist_array, fj, fi, ti, tj) / speed)
+    full = (s2 > s1) & (s1 + tt < l1)
+
+    # partial time overlap: s2 -> s1 -> f2 -> f1
+    tt1 = np.trunc(route_distance(dist_array, fi, fj, ti) / speed)
+    tt2 = np.trunc(route_distance(dist_array, fj, ti, tj) / speed)
+    partial = (s2 <= s1) & (s1 + tt2 < l1) & (s2 + tt1 < l2)
+
+    return (l2 >= s1) & (full | partial)
+
+
+def append_shared_rides(table, packed, i, j):
+    """
+    append the feasible pairs (i[k], j[k]) to the variant table
+    same variants as shared_variant
+    """
+    dist_array = packed.dist_array
+    fi = packed.from_idx[i]
+    ti = packed.to_idx[i]
+    fj = packed.from_idx[j]
+    tj = packed.to_idx[j]
+    full = packed.start[i] > packed.start[j]
+    dd1 = dist_array[fj, tj]
+    dd2 = dist_array[fi, ti]
+    detour_dist = np.where(
+        full,
+        route_distance(dist_array, fj, fi, ti, tj) - dd1,
+        route_distance(dist_array, fi, fj, ti, tj) - dd1 - dd2,
+    )
+    detour_cost = np.trunc(detour_dist * COST_PER_DIST).astype(np.int64)
+    idx_i = packed.idx[i]
+    idx_j = packed.idx[j]
+    table.append(
+        base=j,
+        first=np.where(full, j, i),
+        finish=packed.finish[j],
+        value=packed.value[j] + (packed.value[i] - detour_cost),
+        contains=np.stack([idx_j, idx_i], axis=1),
+        reservations=np.where(
+            full[:, None],
+            np.stack([idx_j, idx_i, idx_i, idx_j], axis=1),
+            np.stack([idx_i, idx_j, idx_i, idx_j], axis=1),
+        ),
+    )
+
+
+def find_share_ride(
+    requests, variants, distances, j, speed=SPEED, first_idx=None, index=None
+):
     """
     find all sharing variants with request j
 
     variants: pass-by-reference
+    first_idx: ID of the first variant, default len(requests)
+    index: time window index (overlap_index), None for testing all i < j
     """
-    for i in range(j - 1, -1, -1):
+    if first_idx is None:
+        first_idx = len(requests)
+    if index is None:
+        candidates = range(j - 1, -1, -1)
+    else:
+        candidates = sharing_candidates(index, j)
+    for i in candidates:
         req_variant = share_ride(requests, distances, i, j, speed)
         if req_variant:
-            req_variant.idx = len(requests) + len(variants)
+            req_variant.idx = first_idx + len(variants)
             # print(f"{req_variant.idx} contains {req_variant.contains[0]}/{req_variant.contains[1]}")
             variants.append(req_variant)
 
 
-def sharing(requests, distances, speed=SPEED):
+def sharing(
+    requests,
+    distances,
+    speed=SPEED,
+    max_dist=None,
+    vectorized=True,
+    max_riders=2,
+    max_detour=None,
+    table=False,
+):
     """
     find all sharing variants for all original requests
+    only pairs with overlapping time windows are evaluated
+    max_dist: skip pairs with pickups farther apart, None for no limit
+    vectorized: test the candidate pairs in batches (share_rides)
+    max_riders > 2: add groups of up to max_riders requests (group_sharing)
+    max_detour: see group_schedule
+    table: return a VariantTable instead of variant requests (vectorized only)
     return list of variants
     """
     l = len(requests)
     variants = []
-    for j in range(l - 1, -1, -1):
-        find_share_ride(requests, variants, distances, j, speed)
+    # variant IDs must not collide with request IDs
+    first_idx = max((r.idx + 1 for r in requests), default=0)
+    index = overlap_index(requests, distances, max_dist)
+    if not vectorized:
+        for j in range(l - 1, -1, -1):
+            find_share_ride(requests, variants, distances, j, speed, first_idx, index)
+        return add_groups(requests, distances, variants, speed, max_riders, max_detour)
+
+    packed = pack_sharing(requests, distances)
+    if table:
+        variants = VariantTable(requests, distances, first_idx)
+    j = l - 1
+    while j >= 0:
+        # collect candidate pairs of some requests, same order as find_share_ride
+        pairs_i = []
+        pairs_j = []
+        while j >= 0 and len(pairs_i) < BATCH:
+            candidates = sharing_candidates(index, j)
+            pairs_i += candidates
+            pairs_j += [j] * len(candidates)
+            j -= 1
+        ok = share_rides(
+            packed,
+            np.array(pairs_i, dtype=np.int64),
+            np.array(pairs_j, dtype=np.int64),
+            speed,
+        )
+        if table:
+            ok = np.flatnonzero(ok)
+            append_shared_rides(
+                variants,
+                packed,
+                np.array(pairs_i, dtype=np.int64)[ok],
+                np.array(pairs_j, dtype=np.int64)[ok],
+            )
+            continue
+        for k in np.flatnonzero(ok).tolist():
+            r = shared_variant(requests, distances, pairs_i[k], pairs_j[k])
+            r.idx = first_idx + len(variants)
+            variants.append(r)
+    return add_groups(requests, distances, variants, speed, max_riders, max_detour)
+
+
+def add_groups(requests, distances, variants, speed, max_riders, max_detour):
+    """
+    append the group variants to the pair variants
+    """
+    if max_riders <= 2:
+        return variants
+    groups = group_sharing(
+        requests, distances, variants, speed, max_riders, max_detour
+    )
+    if isinstance(variants, VariantTable):
+        variants.append_variants(groups)
+        return variants
+    first_idx = max((r.idx + 1 for r in requests), default=0) + len(variants)
+    for k, r in enumerate(groups):
+        r.idx = first_idx + k
+    return variants + groups
+
+
+def group_schedule(requests, distances, stops, speed=SPEED, max_detour=None):
+    """
+    drive along the stops of a shared group
+    stops: list of (request position, True for pickup / False for drop)
+    the vehicle waits at a pickup until the expected start time,
+    every drop has to be before the latest finish time
+    max_detour: longest ride distance of a passenger relative to the direct one
+    returns (gross distance, finish time), None if not feasible
+    """
+    dist_array = distances.dist_array
+    (i, _) = stops[0]
+    req = requests[i]
+    loc = req.from_idx
+    t = req.expected_start_time
+    d = 0
+    picked_up = {}
+    for i, pickup in stops:
+        req = requests[i]
+        to_idx = req.from_idx if pickup else req.to_idx
+        if to_idx != loc:
+            step = dist_array[loc][to_idx]
+            d += step
+            t += step / speed
+            loc = to_idx
+        if pickup:
+            t = max(t, req.expected_start_time)
+            picked_up[i] = d
+        else:
+            if t >= req.latest_finish_time:
+                return None
+            if max_detour is not None:
+                direct = dist_array[req.from_idx][req.to_idx]
+                if d - picked_up[i] > max_detour * direct:
+                    return None
+    return (d, t)
+
+
+def insert_rider(requests, distances, stops, i, speed=SPEED, max_detour=None):
+    """
+    cheapest insertion of pickup and drop of request i into the stops
+    returns (gross distance, finish time, stops), None if not feasible
+    """
+    best = None
+    n = len(stops)
+    for p in range(n + 1):
+        for q in range(p, n + 1):
+            new_stops = stops[:p] + [(i, True)] + stops[p:q] + [(i, False)] + stops[q:]
+            o = group_schedule(requests, distances, new_stops, speed, max_detour)
+            if o and (best is None or o[0] < best[0]):
+                best = (o[0], o[1], new_stops)
+    return best
+
+
+def group_variant(requests, distances, group, stops, finish):
+    """
+    returns the variant request of a shared group served along the stops
+    copy of the last dropped request, started at the first pickup
+    """
+    (first, _) = stops[0]
+    (last, _) = stops[-1]
+    r = copy.copy(requests[last])
+    r.expected_start_time = requests[first].expected_start_time
+    r.from_idx = requests[first].from_idx
+    r.expected_finish_time = max(r.expected_finish_time, finish)
+
+    route = [
+        requests[i].from_idx if pickup else requests[i].to_idx for i, pickup in stops
+    ]
+    gross_dist, r.path = shrink_multi_step_distance(distances, route)
+    direct_dist = 0
+    value = 0
+    for i in group:
+        req = requests[i]
+        direct_dist += distances.dist_array[req.from_idx][req.to_idx]
+        value += req.value
+    r.value = value - dist_to_cost(gross_dist - direct_dist)
+    r.contains = [requests[i].idx for i in group]
+    r.reservations = [requests[i].idx for i, _ in stops]
+    return r
+
+
+def group_sharing(
+    requests, distances, pair_variants, speed=SPEED, max_riders=4, max_detour=None
+):
+    """
+    find sharing variants of 3 up to max_riders requests
+    the groups are cliques of the shareability graph (pair_variants),
+    grown by one request at a time:
+    - a new request has to be shareable with every member
+    - all sub-groups containing the new request have to be feasible
+    - the new request is inserted at the cheapest feasible stops
+    return list of variants, IDs not set
+    """
+    position = {r.idx: k for k, r in enumerate(requests)}
+    neighbors = [set() for _ in requests]
+    if isinstance(pair_variants, VariantTable):
+        pairs = pair_variants.arrays().contains.tolist()
+    else:
+        pairs = [v.contains for v in pair_variants]
+    for contains in pairs:
+        (i, j) = (position[idx] for idx in contains)
+        neighbors[i].add(j)
+        neighbors[j].add(i)
+
+    # evaluation cache: sorted group -> (gross distance, finish, stops) or None
+    cache = {}
+
+    def evaluate(group):
+        if group not in cache:
+            cache[group] = None
+            base = group[:-1]
+            if len(base) == 1:
+                stops = [(base[0], True), (base[0], False)]
+            elif evaluate(base):
+                stops = cache[base][2]
+            else:
+                return None
+            cache[group] = insert_rider(
+                requests, distances, stops, group[-1], speed, max_detour
+            )
+        return cache[group]
+
+    variants = []
+    groups = [
+        (i, j) for i in range(len(requests)) for j in sorted(neighbors[i]) if j > i
+    ]
+    for size in range(3, max_riders + 1):
+        new_groups = []
+        for group in groups:
+            if not evaluate(group):
+                continue
+            common = set.intersection(*(neighbors[i] for i in group))
+            for k in sorted(common):
+                if k < group[-1]:
+                    continue
+                # prune: every sub-group with k has to be feasible
+                if not all(
+                    evaluate(tuple(sorted(group[:m] + group[m + 1 :] + (k,))))
+                    for m in range(len(group))
+                ):
+                    continue
+                new_group = group + (k,)
+                o = evaluate(new_group)
+                if o:
+                    (_, finish, stops) = o
+                    variants.append(
+                        group_variant(requests, distances, new_group, stops, finish)
+                    )
+                    new_groups.append(new_group)
+        groups = new_groups
     return variants
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script plans the shared routes for a grid of parameters offline
+# Planning needs the requests and the distance matrix only, SUMO is not used.
+# The parameter combinations are planned in a process pool, the requests and
+# distances are passed to each worker once and used read-only.
+# =============================================================================
+
+
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+from Tools.dotdict import DotDict
+from Tools.logger import log
+from Opt.optimizer import distance_matrices, routing_with_variants
+from Opt.fleet import minimum_fleet_routes
+from Opt.sharing import sharing
+
+# requests and distances of a worker process, set by init_worker
+worker_data = DotDict()
+
+
+def init_worker(requests, distances, speed, options):
+    worker_data.requests = requests
+    worker_data.distances = distances
+    worker_data.speed = speed
+    worker_data.options = options
+
+
+def plan_shared(
+    requests,
+    distances,
+    speed,
+    realistic_time,
+    late_time,
+    call_to_start,
+    planner="routes",
+    max_riders=2,
+):
+    """
+    plan the shared routes for one parameter combination
+    same as Project.calc_shared without SUMO
+    the requests are copied, the originals stay unchanged
+    """
+    requests = [copy.copy(r) for r in requests]
+    for r in requests:
+        r.set_max_delay(
+            call_to_start=call_to_start,
+            realistic_time=realistic_time,
+            late_time=late_time,
+        )
+    variants = sharing(
+        requests,
+        distances,
+        speed / realistic_time,
+        max_riders=max_riders,
+        table=planner != "min_fleet",
+    )
+    if planner == "min_fleet":
+        return minimum_fleet_routes(0, requests, variants, distances, realistic_time)
+    return routing_with_variants(0, requests, variants, distances, realistic_time)
+
+
+def plan_worker(params):
+    (realistic_time, late_time) = params
+    return plan_shared(
+        worker_data.requests,
+        worker_data.distances,
+        worker_data.speed,
+        realistic_time,
+        late_time,
+        **worker_data.options,
+    )
+
+
+def sweep_shared(
+    requests,
+    distances,
+    speed,
+    grid,
+    call_to_start,
+    planner="routes",
+    max_riders=2,
+    processes=None,
+):
+    """
+    plan the shared routes for all (realistic_time, late_time) in grid
+    processes: number of worker processes, None for all CPUs
+    returns dict (realistic_time, late_time) -> routes
+    the workers need the distance matrix, not a lazy distance oracle
+    """
+    # only the matrices are needed for planning
+    matrices = DotDict()
+    (matrices.dist_array, matrices.time_array) = distance_matrices(distances)
+    options = dict(call_to_start=call_to_start, planner=planner, max_riders=max_riders)
+
+    grid = list(grid)
+    if processes == 1:
+        init_worker(requests, matrices, speed, options)
+        plans = [plan_worker(params) for params in grid]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=init_worker,
+            initargs=(requests, matrices, speed, options),
+        ) as pool:
+            plans = list(pool.map(plan_worker, grid))
+    for (realistic_time, late_time), routes in zip(grid, plans):
+        log(f"realistic_time {realistic_time}, late_time {late_time}: {len(routes)}")
+    return dict(zip(grid, plans))
@@ -0,0 +1,92 @@
+import unittest
+
+from Opt import fleet, optimizer
+from Opt.sharing import sharing
+from Opt.tests.scenario import scenario
+from Net.dist_oracle import DistanceOracle
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+fleet.log = optimizer.log = quiet
+
+
+def matching(follow, n):
+    """
+    size of a maximum matching of the bipartite graph, augmenting paths
+    """
+    match = [-1] * n
+
+    def augment(i, seen):
+        for j in follow[i]:
+            if j not in seen:
+                seen.add(j)
+                if match[j] < 0 or augment(match[j], seen):
+                    match[j] = i
+                    return True
+        return False
+
+    return sum(augment(i, set()) for i in range(n))
+
+
+class TestFleet(unittest.TestCase):
+    def plan(self, seed, **kwargs):
+        (requests, distances, speed) = scenario(seed, **kwargs)
+        variants = sharing(requests, distances, speed / 1.5, table=False)
+        greedy = optimizer.routing_with_variants(0, requests, variants, distances, 1.5)
+        routes = fleet.minimum_fleet_routes(0, requests, variants, distances, 1.5)
+        return requests, greedy, routes
+
+    def test_serves_every_request_once(self):
+        for seed in range(10):
+            (requests, _, routes) = self.plan(seed)
+            served = sorted(i for route in routes for i in route.fullfilled)
+            self.assertEqual(sorted(r.idx for r in requests), served)
+
+    def test_minimum_path_cover(self):
+        # vehicles: trips - maximum matching of the pairs passing in_time
+        for seed in range(20):
+            (requests, distances, _) = scenario(seed, n_poi=5 + seed, n_requests=2 * seed + 1)
+            trips = sorted(requests, key=lambda r: r.expected_start_time)
+            follow = [
+                [j for j, b in enumerate(trips) if optimizer.in_time(a, b, distances, 1.5)]
+                for a in trips
+            ]
+            (routes, _) = fleet.path_cover(
+                0, trips, *optimizer.distance_matrices(distances), 1.5, None
+            )
+            self.assertEqual(len(trips) - matching(follow, len(trips)), len(routes), f"seed {seed}")
+
+    def test_routes_in_time(self):
+        for seed in range(10):
+            (requests, distances, speed) = scenario(seed)
+            variants = sharing(requests, distances, speed / 1.5, table=False)
+            routes = fleet.minimum_fleet_routes(0, requests, variants, distances, 1.5)
+            by_reservations = {tuple(v.reservations): v for v in variants}
+            by_idx = {r.idx: r for r in requests}
+            for route in routes:
+                trips = [
+                    by_reservations.get(tuple(r)) or by_idx[r[0]]
+                    for r in route.reservations
+                ]
+                for a, b in zip(trips, trips[1:]):
+                    self.assertTrue(optimizer.in_time(a, b, distances, 1.5), f"seed {seed}")
+
+    def test_empty_and_single_request(self):
+        (_, _, routes) = self.plan(1, n_requests=0)
+        self.assertEqual([], routes)
+        (requests, _, routes) = self.plan(1, n_requests=1)
+        self.assertEqual(1, len(routes))
+        self.assertEqual([requests[0].idx], routes[0].fullfilled)
+
+    def test_oracle_rejected(self):
+        (requests, distances, speed) = scenario(1, n_requests=3)
+        oracle = DistanceOracle(30)
+        with self.assertRaises(ValueError):
+            fleet.minimum_fleet_routes(0, requests, [], oracle, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import unittest
+
+from Tools.dotdict import DotDict
+from Net.point_of_interest import Point_of_Interest
+from Moving.request import Request
+from Net.dist_oracle import DistanceOracle
+from Opt import optimizer, sweep
+from Opt.sharing import sharing
+from Opt.tests.scenario import scenario
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+optimizer.log = quiet
+
+# (incremental, vectorized)
+MODES = [(False, False), (True, False), (True, True)]
+
+
+def signature(routes):
+    return [(r.fullfilled, r.sum, r.reservations) for r in routes]
+
+
+def chain(n):
+    # n requests between two POIs, each one reachable after the one before
+    pois = []
+    for i in range(2):
+        p = Point_of_Interest(f"p{i}", f"e{i}")
+        p.idx = i
+        pois.append(p)
+    distances = DotDict()
+    distances.dist_array = [[0.0, 100.0], [100.0, 0.0]]
+    distances.time_array = [[0.0, 10.0], [10.0, 0.0]]
+    Request.counter = 0
+    requests = []
+    for k in range(n):
+        r = Request(pois[0], pois[1], submit_time=60 * k, calculated_distance=100.0, calculated_time=10.0)
+        r.from_idx = 0
+        r.to_idx = 1
+        r.set_max_delay(call_to_start=0, realistic_time=1.5, late_time=1.3)
+        requests.append(r)
+    return requests, distances
+
+
+class TestOptimizer(unittest.TestCase):
+    def routes(self, requests, distances, variants, incremental, vectorized):
+        return optimizer.routing_with_variants(
+            0, requests, variants, distances, 1.5, incremental, vectorized
+        )
+
+    def test_modes_same_routes(self):
+        for seed in range(6):
+            (requests, distances, speed) = scenario(seed)
+            variants = sharing(requests, distances, speed / 1.5)
+            expected = signature(self.routes(requests, distances, variants, False, False))
+            for incremental, vectorized in MODES[1:]:
+                routes = self.routes(requests, distances, variants, incremental, vectorized)
+                self.assertEqual(expected, signature(routes), f"seed {seed} {incremental} {vectorized}")
+
+    def test_variant_table_same_routes(self):
+        (requests, distances, speed) = scenario(2)
+        variants = sharing(requests, distances, speed / 1.5)
+        table = sharing(requests, distances, speed / 1.5, table=True)
+        self.assertEqual(
+            signature(self.routes(requests, distances, variants, True, True)),
+            signature(self.routes(requests, distances, table, True, True)),
+        )
+
+    def test_predecessor_index(self):
+        for seed in range(4):
+            (requests, distances, speed) = scenario(seed, n_poi=8, n_requests=150)
+            rv = sorted(requests, key=lambda r: r.latest_finish_time)
+            index = optimizer.predecessor_index(rv, distances, 1.5)
+            for j in range(len(rv)):
+                optimizer.predecessor(rv, distances, j, 1.5)
+                expected = rv[j].pre
+                optimizer.predecessor(rv, distances, j, 1.5, index)
+                self.assertEqual(expected, rv[j].pre, f"seed {seed} request {j}")
+
+    def test_long_chain(self):
+        # more requests on one route than the recursion limit
+        n = sys.getrecursionlimit() + 500
+        (requests, distances) = chain(n)
+        for incremental, vectorized in MODES:
+            routes = self.routes(requests, distances, [], incremental, vectorized)
+            self.assertEqual(1, len(routes))
+            self.assertEqual([r.idx for r in requests], sorted(routes[0].fullfilled))
+
+    def test_empty_and_single_request(self):
+        (requests, distances, speed) = scenario(1, n_requests=1)
+        for incremental, vectorized in MODES:
+            self.assertEqual([], self.routes([], distances, [], incremental, vectorized))
+            routes = self.routes(requests, distances, [], incremental, vectorized)
+            self.assertEqual([[requests[0].idx]], [r.fullfilled for r in routes])
+            self.assertEqual([[[requests[0].idx] * 2]], [r.reservations for r in routes])
+
+    def test_lazy_distances(self):
+        (requests, distances, speed) = scenario(6, n_poi=200, n_requests=40)
+
+        def route(i, j):
+            return (distances.dist_array[i][j], distances.time_array[i][j], 0)
+
+        oracle = DistanceOracle(200, route)
+        for table in (False, True):
+            variants = sharing(requests, distances, speed / 1.5, table=table)
+            expected = signature(self.routes(requests, distances, variants, True, True))
+            variants = sharing(requests, oracle, speed / 1.5, table=table)
+            for incremental, vectorized in MODES:
+                routes = self.routes(requests, oracle, variants, incremental, vectorized)
+                self.assertEqual(expected, signature(routes))
+        # only the pairs of the tested trips are calculated
+        self.assertLess(len(oracle.pairs), 200 * 200 // 4)
+        with self.assertRaises(ValueError):
+            sweep.sweep_shared(requests, oracle, speed, [(1.5, 1.3)], 900, processes=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from Opt import optimizer, rolling
+from Opt.optimizer import in_time, routing_with_variants
+from Opt.rolling import RollingHorizonPlanner, not_before
+from Opt.sharing import sharing
+from Opt.tests.scenario import scenario
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+optimizer.log = rolling.log = quiet
+
+
+def plan_all(planner, requests):
+    t = planner.window
+    while t <= max(r.submit_time for r in requests) + planner.window:
+        planner.plan(requests, t)
+        t = planner.next_time
+    return planner.routes()
+
+
+class TestRolling(unittest.TestCase):
+    def test_serves_every_request_once(self):
+        for seed in range(4):
+            (requests, distances, speed) = scenario(seed)
+            planner = RollingHorizonPlanner(distances, speed, 1.5, window=300)
+            routes = plan_all(planner, requests)
+            served = sorted(i for route in routes for i in route.fullfilled)
+            self.assertEqual(sorted(r.idx for r in requests), served)
+
+    def test_one_window_same_as_routing(self):
+        (requests, distances, speed) = scenario(2)
+        planner = RollingHorizonPlanner(distances, speed, 1.5, window=3601)
+        routes = plan_all(planner, requests)
+        # planned at the end of the window: the pickups start not before
+        requests = [not_before(r, 3601) for r in requests]
+        variants = sharing(requests, distances, speed / 1.5)
+        expected = routing_with_variants(0, requests, variants, distances, 1.5)
+        self.assertEqual(
+            [(r.fullfilled, r.reservations) for r in expected],
+            [(r.fullfilled, r.reservations) for r in routes],
+        )
+
+    def test_appended_routes_in_time(self):
+        # window 1200: pickups of the first requests are due within the window
+        for window in (300, 1200):
+            (requests, distances, speed) = scenario(1)
+            planner = RollingHorizonPlanner(distances, speed, 1.5, window=window)
+            by_idx = {r.idx: r for r in requests}
+            t = planner.window
+            while t <= 3600 + planner.window:
+                last = {i: v.last for i, v in enumerate(planner.vehicles)}
+                for i, reservations in planner.plan(requests, t):
+                    first = not_before(by_idx[reservations[0][0]], t)
+                    if i in last:
+                        self.assertTrue(in_time(last[i], first, distances, 1.5))
+                    last_start = planner.vehicles[i].last.expected_start_time
+                    self.assertGreaterEqual(last_start, t)
+                t = planner.next_time
+
+    def test_pickup_within_window(self):
+        (requests, distances, speed) = scenario(3)
+        times = [(r.expected_start_time, r.latest_finish_time) for r in requests]
+        planner = RollingHorizonPlanner(distances, speed, 1.5, window=1200)
+        routes = plan_all(planner, requests)
+        served = sorted(i for route in routes for i in route.fullfilled)
+        self.assertEqual(sorted(r.idx for r in requests), served)
+        self.assertEqual(
+            times, [(r.expected_start_time, r.latest_finish_time) for r in requests]
+        )
+
+        r = requests[0]
+        t = r.expected_start_time + 100
+        shifted = not_before(r, t)
+        self.assertEqual(t, shifted.expected_start_time)
+        self.assertEqual(r.latest_finish_time + 100, shifted.latest_finish_time)
+        self.assertIs(r, not_before(r, r.expected_start_time))
+
+    def test_late_window_skips_no_request(self):
+        (requests, distances, speed) = scenario(0)
+        planner = RollingHorizonPlanner(distances, speed, 1.5, window=300)
+        # planned late: windows are longer than 300 seconds
+        for t in (300, 1000, 1700, 3000):
+            planner.plan(requests, t)
+        planner.plan(requests, 3601)
+        served = sorted(i for route in planner.routes() for i in route.fullfilled)
+        self.assertEqual(sorted(r.idx for r in requests), served)
+
+    def test_due(self):
+        (requests, distances, speed) = scenario(2, n_requests=10)
+        last_submit = max(r.submit_time for r in requests)
+        planner = RollingHorizonPlanner(distances, speed, 1.5, window=3601)
+        self.assertFalse(planner.due(requests, last_submit))
+        # all requests are submitted: the open window is planned
+        self.assertTrue(planner.due(requests, last_submit + 1))
+        planner.plan(requests, last_submit + 1)
+        self.assertFalse(planner.due(requests, last_submit + 2))
+        self.assertTrue(planner.due(requests, planner.next_time))
+        served = sorted(i for route in planner.routes() for i in route.fullfilled)
+        self.assertEqual(sorted(r.idx for r in requests), served)
+
+    def test_empty_window(self):
+        (requests, distances, speed) = scenario(1, n_requests=0)
+        planner = RollingHorizonPlanner(distances, speed, 1.5)
+        self.assertEqual([], planner.plan(requests, 300))
+        self.assertEqual([], planner.routes())
+        self.assertEqual(600, planner.next_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
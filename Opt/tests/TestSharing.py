@@ -0,0 +1,114 @@
+import random
+import unittest
+
+from Opt import optimizer
+from Opt.sharing import find_share_ride, group_schedule, sharing
+from Opt.tests.scenario import scenario
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+optimizer.log = quiet
+
+
+def signature(variants):
+    return [
+        (v.idx, v.contains, v.reservations, v.value, v.path, v.expected_start_time)
+        for v in variants
+    ]
+
+
+def all_pairs(requests, distances, speed):
+    # find_share_ride without index: all pairs i < j
+    variants = []
+    first_idx = max((r.idx + 1 for r in requests), default=0)
+    for j in range(len(requests) - 1, -1, -1):
+        find_share_ride(requests, variants, distances, j, speed, first_idx)
+    return variants
+
+
+def stops(requests, reservations):
+    # first occurrence of a request is its pickup, second one the drop
+    position = {r.idx: k for k, r in enumerate(requests)}
+    picked_up = set()
+    stops = []
+    for i in reservations:
+        stops.append((position[i], i not in picked_up))
+        picked_up.add(i)
+    return stops
+
+
+class TestSharing(unittest.TestCase):
+    def check_paths(self, requests, distances, speed):
+        expected = signature(all_pairs(requests, distances, speed))
+        loop = signature(sharing(requests, distances, speed, vectorized=False))
+        vectorized = signature(sharing(requests, distances, speed))
+        self.assertEqual(expected, loop)
+        self.assertEqual(expected, vectorized)
+        return expected
+
+    def test_index_finds_all_pairs(self):
+        for seed in range(6):
+            (requests, distances, speed) = scenario(seed)
+            self.assertTrue(self.check_paths(requests, distances, speed / 1.5))
+
+    def test_unsorted_requests(self):
+        for seed in range(6):
+            (requests, distances, speed) = scenario(seed, n_poi=10, n_requests=60)
+            random.Random(seed).shuffle(requests)
+            self.check_paths(requests, distances, speed / 1.5)
+
+    def test_symmetric_distances(self):
+        (requests, distances, speed) = scenario(11, symmetric=True)
+        self.check_paths(requests, distances, speed / 1.5)
+
+    def test_empty_and_single_request(self):
+        (requests, distances, speed) = scenario(1, n_requests=0)
+        self.assertEqual([], sharing(requests, distances, speed))
+        self.assertEqual([], sharing(requests, distances, speed, vectorized=False))
+        (requests, distances, speed) = scenario(1, n_requests=1)
+        self.assertEqual([], sharing(requests, distances, speed))
+
+    def test_groups(self):
+        for seed in range(4):
+            (requests, distances, speed) = scenario(seed, n_poi=10, n_requests=60)
+            speed /= 1.5
+            pairs = sharing(requests, distances, speed)
+            shareable = {frozenset(v.contains) for v in pairs}
+            groups = sharing(requests, distances, speed, max_riders=3)[len(pairs):]
+            self.assertTrue(groups, f"seed {seed}")
+            for v in groups:
+                self.assertEqual(3, len(set(v.contains)))
+                for a in v.contains:
+                    for b in v.contains:
+                        if a != b:
+                            self.assertIn(frozenset((a, b)), shareable)
+                self.assertTrue(
+                    group_schedule(requests, distances, stops(requests, v.reservations), speed)
+                )
+            larger = sharing(requests, distances, speed, max_riders=4)
+            self.assertLessEqual(
+                {tuple(v.contains) for v in groups},
+                {tuple(v.contains) for v in larger},
+            )
+
+    def test_groups_same_in_all_paths(self):
+        (requests, distances, speed) = scenario(5, n_poi=10, n_requests=60)
+        loop = sharing(requests, distances, speed, vectorized=False, max_riders=4)
+        vectorized = sharing(requests, distances, speed, max_riders=4)
+        table = sharing(requests, distances, speed, max_riders=4, table=True)
+        self.assertEqual(signature(loop), signature(vectorized))
+        self.assertEqual(signature(loop), signature(table))
+
+    def test_group_routes_serve_every_request_once(self):
+        (requests, distances, speed) = scenario(3, n_poi=10, n_requests=60)
+        variants = sharing(requests, distances, speed / 1.5, max_riders=4, table=True)
+        routes = optimizer.routing_with_variants(0, requests, variants, distances, 1.5)
+        served = sorted(i for route in routes for i in route.fullfilled)
+        self.assertEqual(sorted(r.idx for r in requests), served)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import copy
+import unittest
+
+from Opt import fleet, optimizer, sweep
+from Opt.fleet import minimum_fleet_routes
+from Opt.optimizer import routing_with_variants
+from Opt.sharing import sharing
+from Opt.sweep import sweep_shared
+from Opt.tests.scenario import scenario
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+fleet.log = optimizer.log = sweep.log = quiet
+
+GRID = [(1.2, 1.1), (1.5, 1.3), (2.0, 1.5)]
+
+
+def signature(plans):
+    return {
+        params: [(r.fullfilled, r.sum, r.reservations) for r in routes]
+        for params, routes in plans.items()
+    }
+
+
+def single_plan(requests, distances, speed, realistic_time, late_time, planner):
+    requests = [copy.copy(r) for r in requests]
+    for r in requests:
+        r.set_max_delay(900, realistic_time, late_time)
+    variants = sharing(requests, distances, speed / realistic_time)
+    if planner == "min_fleet":
+        return minimum_fleet_routes(0, requests, variants, distances, realistic_time)
+    return routing_with_variants(0, requests, variants, distances, realistic_time)
+
+
+class TestSweep(unittest.TestCase):
+    def test_same_as_single_plans(self):
+        (requests, distances, speed) = scenario(4, n_requests=40)
+        for planner in ("routes", "min_fleet"):
+            expected = {
+                params: single_plan(requests, distances, speed, *params, planner)
+                for params in GRID
+            }
+            for processes in (1, 2):
+                plans = sweep_shared(
+                    requests, distances, speed, GRID, 900, planner, processes=processes
+                )
+                self.assertEqual(signature(expected), signature(plans))
+
+    def test_requests_unchanged(self):
+        (requests, distances, speed) = scenario(4, n_requests=40)
+        before = [(r.expected_start_time, r.latest_finish_time) for r in requests]
+        sweep_shared(requests, distances, speed, GRID, 600, processes=1)
+        self.assertEqual(before, [(r.expected_start_time, r.latest_finish_time) for r in requests])
+
+    def test_process_pool(self):
+        (requests, distances, speed) = scenario(4, n_requests=40)
+        self.assertEqual(
+            signature(sweep_shared(requests, distances, speed, GRID, 900, processes=1)),
+            signature(sweep_shared(requests, distances, speed, GRID, 900, processes=2)),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import random
+
+from Tools.dotdict import DotDict
+from Net.point_of_interest import Point_of_Interest
+from Moving.request import Request
+
+
+# random instances for the planner tests: POIs in a square, distances
+# manhattan with noise, requests within one hour
+def scenario(seed, n_poi=30, n_requests=80, symmetric=False):
+    rnd = random.Random(seed)
+    pois = []
+    for i in range(n_poi):
+        p = Point_of_Interest(f"p{i}", f"e{i}")
+        p.road = p.edge_id
+        p.pos = 1.0
+        p.idx = i
+        pois.append(p)
+    xy = [(rnd.uniform(0, 5000), rnd.uniform(0, 5000)) for _ in range(n_poi)]
+    dist = [[0.0] * n_poi for _ in range(n_poi)]
+    time = [[0.0] * n_poi for _ in range(n_poi)]
+    for i in range(n_poi):
+        for j in range(n_poi):
+            if i != j:
+                d = abs(xy[i][0] - xy[j][0]) + abs(xy[i][1] - xy[j][1])
+                dist[i][j] = d + rnd.uniform(0, 300)
+                time[i][j] = dist[i][j] / 8.3 + rnd.uniform(0, 20)
+    if symmetric:
+        for i in range(n_poi):
+            for j in range(i):
+                dist[i][j] = dist[j][i]
+                time[i][j] = time[j][i]
+    distances = DotDict()
+    distances.dist_array = dist
+    distances.time_array = time
+    distances.edges_array = [[0] * n_poi for _ in range(n_poi)]
+
+    Request.counter = 0
+    requests = []
+    for _ in range(n_requests):
+        a = rnd.randrange(n_poi)
+        b = rnd.randrange(n_poi)
+        while b == a:
+            b = rnd.randrange(n_poi)
+        r = Request(
+            pois[a],
+            pois[b],
+            submit_time=rnd.randint(0, 3600),
+            calculated_distance=dist[a][b],
+            calculated_time=time[a][b],
+        )
+        r.from_idx = a
+        r.to_idx = b
+        requests.append(r)
+    requests.sort(key=lambda r: r.submit_time)
+    for r in requests:
+        r.set_max_delay(call_to_start=900, realistic_time=1.5, late_time=1.3)
+    return requests, distances, 8.3
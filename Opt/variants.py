@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides a compact table of sharing variants
+# A variant is stored as one row of parallel arrays with positions of the
+# original requests instead of a copy of a Request. Variant requests are
+# created on access only, e.g. for the trips of the chosen routes.
+# =============================================================================
+
+
+import copy
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+
+# one row per variant, stored in chunks until the table is used
+COLUMNS = ["base", "first", "finish", "value", "contains", "reservations"]
+
+
+def padded(rows, width):
+    """
+    returns list of equally long rows as int64 array, -1 padded
+    rows: list of lists or 2d array
+    """
+    if isinstance(rows, np.ndarray):
+        return np.pad(rows, ((0, 0), (0, width - rows.shape[1])), constant_values=-1)
+    a = np.full((len(rows), width), -1, dtype=np.int64)
+    for k, row in enumerate(rows):
+        a[k, : len(row)] = row
+    return a
+
+
+class VariantTable:
+    """
+    sharing variants as parallel arrays
+    - base: position of the request the variant is a copy of (last drop)
+    - first: position of the request picked up first
+    - finish: expected finish time
+    - value: value of the variant
+    - contains: request IDs of the shared ride, -1 padded
+    - reservations: request IDs in the order of the stops, -1 padded
+    - idx: variant IDs, consecutive from first_idx
+    """
+
+    def __init__(self, requests, distances, first_idx):
+        self.requests = requests
+        self.distances = distances
+        self.first_idx = first_idx
+        self.by_idx = {r.idx: r for r in requests}
+        self.chunks = {key: [] for key in COLUMNS}
+        self.n = 0
+        self.table = None
+
+    def __len__(self):
+        return self.n
+
+    def append(self, base, first, finish, value, contains, reservations):
+        """
+        append variants given as arrays (one entry/row per variant)
+        """
+        for key, a in zip(COLUMNS, (base, first, finish, value)):
+            self.chunks[key].append(np.asarray(a))
+        self.chunks["contains"].append(np.asarray(contains, dtype=np.int64))
+        self.chunks["reservations"].append(np.asarray(reservations, dtype=np.int64))
+        self.n += len(base)
+        self.table = None
+
+    def append_variants(self, variants):
+        """
+        append variant requests (e.g. from Opt.sharing.group_sharing)
+        """
+        if not variants:
+            return
+        position = {r.idx: k for k, r in enumerate(self.requests)}
+        contains = [v.contains for v in variants]
+        reservations = [v.reservations for v in variants]
+        self.append(
+            np.array([position[v.reservations[-1]] for v in variants], np.int64),
+            np.array([position[v.reservations[0]] for v in variants], np.int64),
+            np.array([v.expected_finish_time for v in variants], np.float64),
+            np.array([v.value for v in variants], np.int64),
+            padded(contains, max(len(c) for c in contains)),
+            padded(reservations, max(len(c) for c in reservations)),
+        )
+
+    def arrays(self):
+        """
+        returns the columns as arrays
+        """
+        if self.table is None:
+            table = DotDict()
+            for key in COLUMNS:
+                chunks = self.chunks[key]
+                if key in ("contains", "reservations"):
+                    width = max((c.shape[1] for c in chunks), default=0)
+                    chunks = [padded(c, width) for c in chunks]
+                    empty = np.zeros((0, width), dtype=np.int64)
+                else:
+                    empty = np.zeros(0)
+                table[key] = np.concatenate(chunks) if chunks else empty
+                self.chunks[key] = [table[key]]
+            table.base = table.base.astype(np.intp)
+            table.first = table.first.astype(np.intp)
+            table.value = table.value.astype(np.int64)
+            table.idx = self.first_idx + np.arange(self.n, dtype=np.int64)
+            self.table = table
+        return self.table
+
+    def pack(self):
+        """
+        returns the variants as parallel arrays like Opt.optimizer.pack_requests
+        """
+        table = self.arrays()
+        requests = self.requests
+        n = len(requests)
+        from_idx = np.fromiter((r.from_idx for r in requests), np.intp, n)
+        to_idx = np.fromiter((r.to_idx for r in requests), np.intp, n)
+        start = np.fromiter((r.expected_start_time for r in requests), np.float64, n)
+        latest = np.fromiter((r.latest_finish_time for r in requests), np.float64, n)
+        plan = DotDict()
+        plan.from_idx = from_idx[table.first]
+        plan.to_idx = to_idx[table.base]
+        plan.start = start[table.first]
+        plan.finish = table.finish.astype(np.float64)
+        plan.latest = latest[table.base]
+        plan.value = table.value
+        plan.idx = table.idx
+        plan.contains = table.contains
+        return plan
+
+    def __getitem__(self, k):
+        """
+        returns variant k as Request
+        """
+        table = self.arrays()
+        req = self.requests[int(table.base[k])]
+        first = self.requests[int(table.first[k])]
+        r = copy.copy(req)
+        r.idx = int(table.idx[k])
+        r.expected_start_time = first.expected_start_time
+        r.from_idx = first.from_idx
+        finish = float(table.finish[k])
+        if finish != req.expected_finish_time:
+            r.expected_finish_time = finish
+        r.value = int(table.value[k])
+        r.contains = [i for i in table.contains[k].tolist() if i >= 0]
+        r.reservations = [i for i in table.reservations[k].tolist() if i >= 0]
+        r.path = self.path(r.reservations)
+        return r
+
+    def __iter__(self):
+        for k in range(self.n):
+            yield self[k]
+
+    def path(self, reservations):
+        """
+        returns the compact path of the stops
+        first occurrence of a request is its pickup, second one the drop
+        """
+        picked_up = set()
+        path = []
+        for i in reservations:
+            req = self.by_idx[i]
+            if i in picked_up:
+                to_idx = req.to_idx
+            else:
+                picked_up.add(i)
+                to_idx = req.from_idx
+            if not path or path[-1] != to_idx:
+                path.append(to_idx)
+        return path
@@ -25,6 +25,7 @@ from Moving.passengers import update_entering_and_leaving
 from Moving.vehicles import Vehicle
 from Moving.taxi_fleet_state_wrapper import TaxiFleetStateWrapper, TaxiState
 from Moving.vehicle_monitoring import VehicleMonitoring, State
+from Opt.rolling import RollingHorizonPlanner
 from KI4RoboRoutingTools.Prediction_Model.Algorithms.algorithm_factory import AlgorithmFactory
 from KI4RoboRoutingTools.Prediction_Model.edge_coordinates import EdgeCoordinates, Coordinates
 from KI4RoboRoutingTools.Prediction_Model.sector_coordinates import SectorCoordinates, Sector
@@ -114,12 +115,25 @@ def shared_strategy(data: ProjectConfigData):
     - one taxi per shared route
     - all reservations out at the beginning
     - dispatches one or two reservations
+    - shared_window > 0: plans the routes window by window while running,
+      see Opt.rolling.RollingHorizonPlanner
 
     """
     parking = data.parking
     requests = data.requests
     routes = data.routes
 
+    planner = None
+    if int(data.shared_window):
+        planner = RollingHorizonPlanner(
+            data.distances,
+            data.speed / data.realistic_time,
+            time_safety_factor=data.realistic_time,
+            window=int(data.shared_window),
+            max_riders=int(data.max_riders),
+        )
+        routes = []
+
     # add routes to sumo and store route-id in poi
     # used to initially send taxis to parking places
     for poi in parking:
@@ -176,6 +190,20 @@ def shared_strategy(data: ProjectConfigData):
         sumo_time = sf.simulation_step()
         if sumo_time % 100 == 0:
             dlog(f"step {sumo_time}")
+
+        # plan the requests of the last window, or of the open window
+        # when all requests are submitted
+        # - new trips are appended to the vehicles, new vehicles are started
+        if planner and planner.due(open_requests, sumo_time):
+            for i, trips in planner.plan(open_requests, sumo_time):
+                vehID = f"taxi_{i:04d}"
+                if vehID not in vehicle_reservations:
+                    vehicle_reservations[vehID] = []
+                    vehicle_positions[vehID] = Vehicle(vehID=vehID)
+                    sf.add_and_route_vehicle(vehID, parking[i % no_park])
+                vehicle_reservations[vehID] += trips
+                xlog(name="route", vehicle=vehID, route=str(trips))
+
         full_vehicle_id_list = traci.vehicle.getIDList()
         empty_fleet = list(traci.vehicle.getTaxiFleet(TaxiState.Empty))
 
@@ -252,6 +280,9 @@ def shared_strategy(data: ProjectConfigData):
         if not un_fullfilled:
             sumo_time = timeout
 
+    if planner:
+        data.routes = planner.routes()
+
     if Request.manager:
         d_full_mileage = 0
         for vehID, vehicle in vehicle_positions.items():
@@ -374,12 +405,13 @@ def simple_strategy(data: ProjectConfigData):
     log(f"Stop at {sumo_time} with {len(un_fullfilled)} unfullfilled requests")
 
 
-def look_ahead_strategy(data: ProjectConfigData):
+def look_ahead_strategy(data: ProjectConfigData, router=None):
     """
     using shared routes
     - one taxi per shared route
     - all reservations out at the beginning
     - dispatches one or two reservations
+    - router: Net.router.AltRouter to find the nearest vehicle without TraCI
 
     """
     parking = data.parking
@@ -466,7 +498,7 @@ def look_ahead_strategy(data: ProjectConfigData):
             min_dist = 100000
             for vehID in empty_fleet:
                 vehicle_edge = vehicle_positions[vehID].edge
-                stage_to = traci.simulation.findRoute(vehicle_edge, req.from_edge)
+                stage_to = sf.find_route(vehicle_edge, req.from_edge, router)
                 if stage_to and len(stage_to.edges):
                     if stage_to.length < min_dist:
                         min_dist = stage_to.length
@@ -516,11 +548,12 @@ def look_ahead_strategy(data: ProjectConfigData):
     log(f"Stop at {sumo_time} with {len(un_fullfilled)} unfullfilled requests")
 
 
-def sup_learn_strategy(data: ProjectConfigData):
+def sup_learn_strategy(data: ProjectConfigData, router=None):
     """
     using supervised learning to optimize dispatching
     - taxi can get in "optimizing" state (drives without passenger to strategically good position)
     - taxi can only carry one passenger
+    - router: Net.router.AltRouter to find the nearest vehicle without TraCI
 
     """
     parking = data.parking
@@ -627,7 +660,7 @@ def sup_learn_strategy(data: ProjectConfigData):
             min_dist = 100000
             for vehID in empty_fleet:
                 vehicle_edge = vehicle_positions[vehID].edge
-                stage_to = traci.simulation.findRoute(vehicle_edge, req.from_edge)
+                stage_to = sf.find_route(vehicle_edge, req.from_edge, router)
                 if stage_to and len(stage_to.edges):
                     if stage_to.length < min_dist:
                         min_dist = stage_to.length
@@ -656,7 +689,7 @@ def sup_learn_strategy(data: ProjectConfigData):
             if better_pos_edge:
                 # traci.vehicle.changeTarget(vehID, better_pos_edge)
                 if sf.route_to_edge_for_optimization(taxi_fleet_state_wrapper=taxi_fleet_state, vehID=vehID,
-                                                    target_edge=better_pos_edge):
+                                                    target_edge=better_pos_edge, router=router):
                     dlog(f"({sumo_time}) Successfully send {vehID} for optimization to edge {better_pos_edge}")
                     monitoring.update_veh_state(vehID=vehID, state=State.positioning, sumo_time=sumo_time)
                     algorithm.push_edge(vid=vehID, edge_id=better_pos_edge, time=sumo_time)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides a cache of the compiled SUMO network next to the
+# sumocfg: the SumoReader with its POI_Manager after read_config and
+# clean_roads (edges, lanes, connections, cleaned POIs and parking)
+#   <config>.compiled.json: version, parameters and the input files
+#                           (size, mtime, sha256)
+#   <config>.compiled.pickle: the SumoReader
+# The content of a file is hashed again only if its size or mtime changed.
+# =============================================================================
+
+
+import gc
+import hashlib
+import json
+import os
+
+from Tools.logger import dlog
+from Tools.pickle_io import read_pickle, write_pickle
+
+# increase if SumoReader, POI_Manager or the cached data change
+CACHE_VERSION = 3
+
+
+def cache_files(config_file):
+    """
+    returns the manifest and the pickle file of the cache of config_file
+    """
+    base = os.path.splitext(str(config_file))[0]
+    return (f"{base}.compiled.json", f"{base}.compiled.pickle")
+
+
+def input_files(reader, config_file):
+    """
+    returns the existing files read by reader.read_config(config_file)
+    """
+    (net_file, add_files, view_settings, poi_edges) = reader.config_files(config_file)
+    files = [config_file, net_file] + add_files + [view_settings, poi_edges]
+    return [str(f) for f in files if f and os.path.isfile(f)]
+
+
+def file_hash(filename):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_entry(filename, digest=None):
+    """
+    returns [filename, size, mtime, sha256] of the file
+    """
+    st = os.stat(filename)
+    return [filename, st.st_size, st.st_mtime_ns, digest or file_hash(filename)]
+
+
+def write_manifest(filename, manifest):
+    tmp = f"{filename}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, filename)
+
+
+def load_reader(reader, config_file, **params):
+    """
+    returns the cached SumoReader of config_file, None if it is missing
+    or an input file or a parameter changed
+    reader: new SumoReader, for the list of input files
+    """
+    (manifest_file, pickle_file) = cache_files(config_file)
+    if not os.path.exists(manifest_file) or not os.path.exists(pickle_file):
+        return None
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_VERSION or manifest.get("params") != params:
+        return None
+    files = input_files(reader, config_file)
+    if [entry[0] for entry in manifest["files"]] != files:
+        return None
+    touched = False
+    for entry in manifest["files"]:
+        (filename, size, mtime, digest) = entry
+        st = os.stat(filename)
+        if st.st_size != size:
+            return None
+        if st.st_mtime_ns != mtime:
+            # touched: same content is still valid
+            if file_hash(filename) != digest:
+                return None
+            entry[2] = st.st_mtime_ns
+            touched = True
+    # many small objects: the garbage collector would run again and again
+    gc.disable()
+    try:
+        cached = read_pickle(pickle_file)
+    finally:
+        gc.enable()
+    if cached is None:
+        return None
+    if touched:
+        write_manifest(manifest_file, manifest)
+    dlog(f"compiled net from {pickle_file}")
+    return cached
+
+
+def save_reader(reader, config_file, **params):
+    """
+    store the SumoReader of config_file, read and cleaned with params
+    """
+    (manifest_file, pickle_file) = cache_files(config_file)
+    manifest = {
+        "version": CACHE_VERSION,
+        "params": params,
+        "files": [file_entry(f) for f in input_files(reader, config_file)],
+    }
+    try:
+        tmp = f"{pickle_file}.tmp"
+        write_pickle(tmp, reader)
+        os.replace(tmp, pickle_file)
+        write_manifest(manifest_file, manifest)
+    except OSError as e:
+        dlog(f"compiled net not stored: {e}")
+        return
+    dlog(f"compiled net stored in {pickle_file}")
@@ -16,13 +16,13 @@ from Moving.request_manager import Request_Manager
 from Tools.dotdict import DotDict
 import os
 import atexit
+from functools import partial
 import pandas as pd
 import xml.etree.ElementTree as ET
 from typing import List
 
 from random import randint, choice
 
-from Tools.pickle_io import read_pickle, write_pickle
 from Tools.logger import log, elog, dlog
 
 from Net.point_of_interest import PARKING_POI, Point_of_Interest
@@ -37,10 +37,24 @@ from Project.check import (
 from Project.project_data import ProjectConfigData
 
 from Net.poi_manager import POI_Manager
+from Net.dist_cache import (
+    net_key,
+    distances_key,
+    load_distances,
+    find_base,
+    save_distances,
+)
+from Net.road_graph import poi_rows, poi_columns, poi_pair
+from Net.dist_oracle import DistanceOracle
+from Net.router import alt_router
 from Project.sumo_reader import SumoReader
+from Project.net_cache import load_reader, save_reader
+from Project.project_store import load_project, save_project
 
 from Opt.optimizer import routing_with_variants
+from Opt.fleet import minimum_fleet_routes
 from Opt.sharing import sharing
+from Opt.sweep import sweep_shared
 
 from Tools.check_sumo import sumo_available
 from KI4RoboRoutingTools.Request_Creation.sumohelper.EdgeCoordsAccess import EdgeCoordsAccess
@@ -71,6 +85,16 @@ def starting_POI(poi_mgr: POI_Manager, no_of_poi: int) -> List[Point_of_Interest
 STAY_TIME = 10
 
 
+def snap_key(edge, pos, tolerance):
+    """
+    location of a generic POI: positions on the edge are snapped to
+    multiples of tolerance, 0 for the exact position
+    """
+    if tolerance > 0:
+        return (edge, round(pos / tolerance))
+    return (edge, pos)
+
+
 def passenger_request(poi_arr, distances, epoch_duration) -> Request:
     valid_POIs = [poi for poi in poi_arr if poi.poi_type != PARKING_POI]
     return random_request(valid_POIs, distances, epoch_duration)
@@ -112,9 +136,11 @@ class Project:
     def __init__(self):
         self.traci_started = False
         self.data: ProjectConfigData = None
+        self.reader: SumoReader = None
+        self.graph = None
 
     def load(self, config: ProjectConfigData):
-        self.data: ProjectConfigData = read_pickle(config.project_file, config)
+        self.data: ProjectConfigData = load_project(config)
 
         for att, value in config.__dict__.items():
             if value != None:
@@ -134,6 +160,8 @@ class Project:
             elog(
                 f"Using requests, POI, parking and distances from {config.project_file}"
             )
+            if isinstance(self.data.distances, DistanceOracle):
+                self.attach_distances(self.data.distances)
 
         if self.data.edge_coords == None or len(self.data.edge_coords) == 0:
             dlog(f"Reading EdgeCoords from {config.edge_coords_file}")
@@ -165,15 +193,153 @@ class Project:
     def init_poi_manager(self):
         assert self.data.clean_edge != None
         self.init_sumo()
-        poi_mgr = POI_Manager()
-        reader = SumoReader(poi_mgr)
+        return self.load_net().poi_mgr
+
+    def load_net(self):
+        """
+        reads the cleaned net into self.reader,
+        from the compiled net cache if it is up to date
+        """
+        reader = SumoReader(POI_Manager())
+        self.graph = None
+        # compiled net of the same files and cleaning
+        params = dict(
+            clean_edge=self.data.clean_edge,
+            skip_find_route_to_clean_edge=self.data.skip_find_route_to_clean_edge,
+        )
+        cached = load_reader(reader, self.data.sumo_config_file, **params)
+        if cached:
+            self.reader = cached
+            return cached
+
         reader.read_config(self.data.sumo_config_file)
-        
-        # clean_roads takes a lot of time, therefore it should be considered to skip this method
-        reader.clean_roads(traci, self.data.clean_edge,
+        self.reader = reader
+
+        # keeps the roads with routes to and from clean_edge
+        reader.clean_roads(self.data.clean_edge,
                            skip_find_route_to_clean_edge=self.data.skip_find_route_to_clean_edge)
-        
-        return poi_mgr
+        save_reader(reader, self.data.sumo_config_file, **params)
+
+        return reader
+
+    def road_graph(self):
+        """
+        road graph of the cleaned net, the net is read at most once
+        (also after loading the project)
+        """
+        if self.graph is None:
+            if self.reader is None:
+                self.load_net()
+            self.graph = self.reader.road_graph()
+        return self.graph
+
+    def calc_dist_matrix(self, poi_mgr: POI_Manager):
+        """
+        distances/times between the POIs of the project
+        dist_engine "net": from the road graph of the net file, without SUMO
+        dist_engine "traci": traci.simulation.findRoute for each pair
+        dist_processes: worker processes (net) or SUMO instances (traci),
+        0 for all CPUs
+        dist_cache: directory of the matrix cache (relative to the SUMO config),
+        a cached matrix with most of the POIs is updated
+        dist_lazy: capacity of a DistanceOracle instead of the matrix
+        """
+        if int(self.data.dist_lazy):
+            graph = self.road_graph()
+            poi_mgr.poi_arr = self.data.poi
+            poi_mgr.average_speed = graph.average_speed()
+            distances = DistanceOracle(
+                len(self.data.poi), capacity=int(self.data.dist_lazy)
+            )
+            self.attach_distances(distances, poi_mgr)
+            return distances
+
+        if not self.data.create_dist_matrix:
+            return poi_mgr.empty_dist_matrix(poi_arr=self.data.poi)
+
+        # cached matrices of the same net, POIs and engine
+        key = None
+        base = None
+        if self.data.dist_cache:
+            cache_dir = os.path.join(
+                os.path.dirname(self.data.sumo_config_file), self.data.dist_cache
+            )
+            base_key = net_key(self.reader.net_file, engine=self.data.dist_engine)
+            key = distances_key(base_key, self.data.poi)
+            distances = load_distances(cache_dir, key)
+            if distances:
+                poi_mgr.poi_arr = self.data.poi
+                poi_mgr.average_speed = distances.average_speed
+                return distances
+            base = find_base(cache_dir, base_key, self.data.poi)
+
+        processes = int(self.data.dist_processes) or os.cpu_count()
+        if base and self.data.dist_engine == "traci":
+            distances = poi_mgr.update_dist_matrix(
+                base,
+                partial(poi_mgr.traci_rows, traci),
+                partial(poi_mgr.traci_columns, traci),
+                poi_arr=self.data.poi,
+            )
+        elif base:
+            graph = self.road_graph()
+            distances = poi_mgr.update_dist_matrix(
+                base,
+                partial(poi_rows, graph, self.data.poi),
+                partial(poi_columns, graph, self.data.poi),
+                poi_arr=self.data.poi,
+            )
+        elif self.data.dist_engine == "traci" and processes > 1:
+            sumo_cmd = [checkBinary("sumo"), "-W", "-Q", "-c", self.data.sumo_config_file]
+            distances = poi_mgr.shard_dist_matrix(
+                traci, sumo_cmd, processes, poi_arr=self.data.poi
+            )
+        elif self.data.dist_engine == "traci":
+            distances = poi_mgr.dist_matrix(traci, poi_arr=self.data.poi)
+        else:
+            distances = poi_mgr.net_dist_matrix(
+                self.road_graph(),
+                poi_arr=self.data.poi,
+                processes=processes,
+            )
+        if key:
+            distances = save_distances(
+                cache_dir, key, distances, poi_mgr.get_speed(), base_key, self.data.poi
+            )
+        return distances
+
+    def attach_distances(self, distances, poi_mgr=None):
+        """
+        set the routing of a DistanceOracle, also after loading the project
+        """
+        if self.data.dist_engine == "traci":
+            if poi_mgr is None:
+                self.init_sumo()
+                poi_mgr = POI_Manager()
+                poi_mgr.poi_arr = self.data.poi
+            distances.route = partial(poi_mgr.poi_pair, traci)
+        else:
+            distances.route = partial(poi_pair, self.road_graph(), self.data.poi)
+
+    def dispatch_router(self):
+        """
+        router for dispatching, None for TraCI routing
+        dispatch_router: number of landmarks
+        the landmarks are stored in dist_cache
+        """
+        landmarks = int(self.data.dispatch_router)
+        if not landmarks:
+            return None
+        graph = self.road_graph()
+        path = None
+        if self.data.dist_cache:
+            key = net_key(self.reader.net_file, landmarks=landmarks)
+            path = os.path.join(
+                os.path.dirname(self.data.sumo_config_file),
+                self.data.dist_cache,
+                f"router_{key}.npz",
+            )
+        return alt_router(graph, path, landmarks)
 
     def select_poi_and_create_requests(self):
         """
@@ -185,10 +351,7 @@ class Project:
         self.data.parking = [
             poi for poi in self.data.poi if poi.poi_type == PARKING_POI
         ]
-        if self.data.create_dist_matrix:
-            self.data.distances = poi_mgr.dist_matrix(traci, poi_arr=self.data.poi)
-        else:
-            self.data.distances = poi_mgr.empty_dist_matrix(poi_arr=self.data.poi)
+        self.data.distances = self.calc_dist_matrix(poi_mgr)
         self.data.speed = poi_mgr.get_speed()
 
         unsorted = []
@@ -205,7 +368,7 @@ class Project:
         )
 
         log(f"Project saving {self.data.project_file} ")
-        write_pickle(self.data.project_file, self.data)
+        save_project(self.data.project_file, self.data)
 
     def read_requests_xml_file(self, start=0):
         """
@@ -218,13 +381,28 @@ class Project:
         poi_mgr = self.init_poi_manager()
         parking = poi_mgr.parking_POI()
         poi_arr = []
+        # ids of the POIs in poi_arr, the POIs have no __eq__
+        in_poi_arr = set()
         dlog(f"read requests {self.data.requests_file}")
         netTree = ET.parse(self.data.requests_file)
         netRoot = netTree.getroot()
         requests = netRoot.findall("request")
 
         checked_requests = []
-        genericPoiIdCounter = 0
+        # generic POIs by location, requests at the same place share one POI
+        generic_poi = {}
+        snap = float(self.data.generic_poi_snap)
+
+        def generic(edge, pos):
+            key = snap_key(edge, pos, snap)
+            poi = generic_poi.get(key)
+            if poi is None:
+                poi = Point_of_Interest(f"generic_{len(generic_poi)}", edge)
+                poi.pos = pos
+                poi.poi_type = "genericPOI"
+                poi.road = edge
+                generic_poi[key] = poi
+            return poi
 
         # iterate XML-requests
         for req in requests:
@@ -240,19 +418,14 @@ class Project:
                     req.attrib.get("toEdge"), float(req.attrib.get("toEdgePosition"))
                 )
 
-            # if the current customer request is not assigned to a certain POIs, we create a generic POIs
+            # if the current customer request is not assigned to a certain POIs, we use generic POIs
             if from_poi is None or to_poi is None:
-                genericPoiId = "generic_"+str(genericPoiIdCounter)
-                from_poi = Point_of_Interest(genericPoiId, req.attrib.get("fromEdge"))
-                from_poi.pos = float(req.attrib.get("fromEdgePosition"))
-                from_poi.poi_type = "genericPOI"
-                from_poi.road = req.attrib.get("fromEdge")
-                genericPoiId = "generic_"+str(genericPoiIdCounter + 1)
-                genericPoiIdCounter += 1
-                to_poi = Point_of_Interest(genericPoiId, req.attrib.get("toEdge"))
-                to_poi.pos = float(req.attrib.get("toEdgePosition"))                
-                to_poi.poi_type = "genericPOI"
-                to_poi.road = req.attrib.get("toEdge")
+                from_poi = generic(
+                    req.attrib.get("fromEdge"), float(req.attrib.get("fromEdgePosition"))
+                )
+                to_poi = generic(
+                    req.attrib.get("toEdge"), float(req.attrib.get("toEdgePosition"))
+                )
                 
             if from_poi and to_poi:
                 dreq = DotDict()
@@ -261,12 +434,11 @@ class Project:
                 dreq.submit_time = int(req.attrib.get("submitTime"))
                 checked_requests.append(dreq)
 
-                if from_poi not in poi_arr:
-                    from_poi.idx = len(poi_arr)
-                    poi_arr.append(from_poi)
-                if to_poi not in poi_arr:
-                    to_poi.idx = len(poi_arr)
-                    poi_arr.append(to_poi)
+                for poi in (from_poi, to_poi):
+                    if id(poi) not in in_poi_arr:
+                        in_poi_arr.add(id(poi))
+                        poi.idx = len(poi_arr)
+                        poi_arr.append(poi)
                 
 
         self.data.poi = poi_arr + parking
@@ -279,10 +451,7 @@ class Project:
         self.data.parking = [
             poi for poi in self.data.poi if poi.poi_type == PARKING_POI
         ]
-        if self.data.create_dist_matrix:
-            self.data.distances = poi_mgr.dist_matrix(traci, poi_arr=self.data.poi)
-        else:
-            self.data.distances = poi_mgr.empty_dist_matrix(poi_arr=self.data.poi)
+        self.data.distances = self.calc_dist_matrix(poi_mgr)
 
         unsorted = []
         # iterate XML-requests a second time, now they have already valid POIs
@@ -308,7 +477,7 @@ class Project:
         self.data.requests = sorted(
             unsorted, key=lambda r: r.submit_time, reverse=False
         )
-        write_pickle(self.data.project_file, self.data)
+        save_project(self.data.project_file, self.data)
         dlog(f"Project saving {self.data.project_file} with {len(self.data.requests)} ")
 
     def read_edge_coords_xml(self):
@@ -404,22 +573,68 @@ class Project:
     def calc_variants(self, realistic_time):
         self.data.realistic_time = realistic_time
         return sharing(
-            self.data.requests, self.data.distances, self.data.speed / realistic_time
+            self.data.requests,
+            self.data.distances,
+            self.data.speed / realistic_time,
+            max_riders=int(self.data.max_riders),
         )
 
     def calc_shared(self, realistic_time):
         self.init_sumo()
         self.data.realistic_time = realistic_time
         self.data.requests = check_requests(self.data.requests)
+        if int(self.data.shared_window):
+            # routes are planned window by window in the shared strategy
+            self.data.routes = []
+            return 0
+        # the routes planner needs the variant requests of the routes only
         variants = sharing(
-            self.data.requests, self.data.distances, self.data.speed / realistic_time
+            self.data.requests,
+            self.data.distances,
+            self.data.speed / realistic_time,
+            max_riders=int(self.data.max_riders),
+            table=self.data.shared_planner != "min_fleet",
         )
         dlog(f"variants on time_safety {realistic_time}: {len(variants)} ")
 
-        self.data.routes = routing_with_variants(
-            0, self.data.requests, variants, self.data.distances, realistic_time
+        if self.data.shared_planner == "min_fleet":
+            self.data.routes = minimum_fleet_routes(
+                0, self.data.requests, variants, self.data.distances, realistic_time
+            )
+        else:
+            self.data.routes = routing_with_variants(
+                0, self.data.requests, variants, self.data.distances, realistic_time
+            )
+        save_project(self.data.project_file, self.data)
+        return len(self.data.routes)  # num of vehicles
+
+    def plan_shared_sweep(self, realistic_times, lateness_factors, processes=None):
+        """
+        plan the shared routes of all parameter combinations offline
+        SUMO is used once to check the requests
+        returns dict (realistic_time, lateness_factor) -> routes
+        """
+        self.init_sumo()
+        self.data.requests = check_requests(self.data.requests)
+        grid = [(rt, lf) for rt in realistic_times for lf in lateness_factors]
+        return sweep_shared(
+            self.data.requests,
+            self.data.distances,
+            self.data.speed,
+            grid,
+            call_to_start=MINUTE * 15,
+            planner=self.data.shared_planner,
+            max_riders=int(self.data.max_riders),
+            processes=processes,
         )
-        write_pickle(self.data.project_file, self.data)
+
+    def set_shared_routes(self, realistic_time, routes):
+        """
+        use routes planned offline, see plan_shared_sweep
+        """
+        self.data.realistic_time = realistic_time
+        self.data.routes = routes
+        save_project(self.data.project_file, self.data)
         return len(self.data.routes)  # num of vehicles
 
     def save(self):
@@ -428,7 +643,7 @@ class Project:
             f"P{self.data.no_of_poi}T{self.data.no_of_trips}L{self.data.delay}.pickle"
         )
         project_file = os.path.abspath(os.path.join(dir, filename))
-        write_pickle(project_file, self.data)
+        save_project(project_file, self.data)
 
     def cleanup(self):
         traci.close()
@@ -486,11 +701,11 @@ class Project:
             num_of_vehicles = len(self.data.routes)
 
         if strategy == "look_ahead":
-            look_ahead_strategy(self.data)
+            look_ahead_strategy(self.data, router=self.dispatch_router())
             num_of_vehicles = self.data.no_of_vehicles
 
         if strategy == "sup_learn":
-            sup_learn_strategy(self.data)
+            sup_learn_strategy(self.data, router=self.dispatch_router())
             num_of_vehicles = self.data.no_of_vehicles
 
         if Request.manager:
@@ -39,7 +39,17 @@ class ProjectConfigData:
         self.sumo_config_file = sumo_config_file
         self.project_file = project_file
         self.create_dist_matrix = kwargs.get("create_dist_matrix", False)
+        self.dist_engine = kwargs.get("dist_engine", "traci")
+        self.dist_processes = kwargs.get("dist_processes", 1)
+        self.dist_cache = kwargs.get("dist_cache", "")
+        self.dist_lazy = kwargs.get("dist_lazy", 0)
+        self.dispatch_router = kwargs.get("dispatch_router", 0)
+        self.generic_poi_snap = kwargs.get("generic_poi_snap", 0)
+        # keep all road edges, see SumoReader.clean_roads
         self.skip_find_route_to_clean_edge = kwargs.get("skip_find_route_to_clean_edge", False)
+        self.shared_planner = kwargs.get("shared_planner", "routes")
+        self.shared_window = kwargs.get("shared_window", 0)
+        self.max_riders = kwargs.get("max_riders", 2)
         self.edge_coords_file = kwargs.get("edge_coords_file", None)
         self.sector_coords_file = kwargs.get("sector_coords_file", None)
         self.sup_learn_training_data_file = kwargs.get("sup_learn_training_data_file", None)
@@ -54,6 +64,23 @@ class ProjectConfigData:
         self.sector_coords: List[SectorCoord] = None
         self.sup_learn_training_data: pd.DataFrame = None
 
+    def __getattr__(self, name):
+        # sections of a stored project are read on first use (project_store)
+        artifact = self.__dict__.get("_artifact")
+        if artifact is None or not artifact.load_attribute(self, name):
+            raise AttributeError(name)
+        return self.__dict__[name]
+
+    def __getstate__(self):
+        # pickled with all sections, without the stored project
+        if "_artifact" in self.__dict__:
+            for name in (
+                "poi", "parking", "requests", "distances", "routes",
+                "edge_coords", "sector_coords", "sup_learn_training_data",
+            ):
+                getattr(self, name)
+        return {k: v for k, v in self.__dict__.items() if k != "_artifact"}
+
 
 def project_config_from_options(options) -> ProjectConfigData:
     if options.sumo_config_file and options.project_file:
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+
+# =============================================================================
+# Created at Hochschule Esslingen - University of Applied Sciences
+# Department: Anwendungszentrum KEIM
+# Contact: emanuel.reichsoellner@hs-esslingen.de
+# Date: October 2026
+# License: MIT License
+# =============================================================================
+# This Script provides the project artifact, the ProjectConfigData stored
+# in sections instead of one pickle file:
+#   <project>.project/manifest.json: schema version and the section files
+#   config: the settings (JSON)
+#   poi, requests, routes, coords, training: pickled, the POIs and requests
+#       are referenced by index from the later sections
+#   distances: .npy matrices and routes (Net.dist_cache format), memory-mapped,
+#       a lazy distance oracle is pickled with its known pairs
+# A section is read on first use of one of its attributes. Changed sections
+# are written to new files, then the manifest is replaced: readers see the
+# old or the new project, never a part of both. The files of the manifest
+# before are removed on the next save.
+# =============================================================================
+
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import uuid
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.logger import dlog, elog
+from Tools.pickle_io import read_pickle
+from Net.dist_cache import open_distances, save_distances
+from Net.route_store import RouteStore
+from Net.point_of_interest import Point_of_Interest
+from Moving.request import Request
+
+# increase if the sections or their format change
+PROJECT_SCHEMA = 1
+
+# section: attributes of ProjectConfigData, in the order of their references
+SECTIONS = {
+    "poi": ("poi", "parking"),
+    "requests": ("requests",),
+    "distances": ("distances",),
+    "routes": ("routes",),
+    "coords": ("edge_coords", "sector_coords"),
+    "training": ("sup_learn_training_data",),
+}
+
+# sections that reference the objects of other sections
+REFERENCES = {
+    "requests": ("poi",),
+    "routes": ("poi", "requests"),
+}
+
+SECTION_OF = {att: name for name, atts in SECTIONS.items() for att in atts}
+
+
+def artifact_dir(project_file):
+    """
+    returns the directory of the project artifact of project_file,
+    None if project_file is no file name
+    """
+    if not project_file or os.path.isdir(project_file):
+        return None
+    return f"{os.path.splitext(str(project_file))[0]}.project"
+
+
+def references(data, section):
+    """
+    returns {id(obj): (kind, index)} of the objects the section refers to
+    """
+    refs = {}
+    for name in REFERENCES.get(section, ()):
+        for i, obj in enumerate(getattr(data, SECTIONS[name][0]) or ()):
+            refs[id(obj)] = (name, i)
+    return refs
+
+
+class SectionPickler(pickle.Pickler):
+    def __init__(self, file, refs):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.refs = refs
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (Point_of_Interest, Request)):
+            return self.refs.get(id(obj))
+        return None
+
+
+class SectionUnpickler(pickle.Unpickler):
+    def __init__(self, file, data):
+        super().__init__(file)
+        self.data = data
+
+    def persistent_load(self, pid):
+        (name, i) = pid
+        return getattr(self.data, SECTIONS[name][0])[i]
+
+
+def matrix_distances(distances):
+    """
+    returns the distances with a RouteStore as edges_array for save_distances,
+    None for a lazy distance oracle (Net.dist_oracle) or no distances
+    """
+    if getattr(distances, "dist_array", None) is None:
+        return None
+    if hasattr(distances.dist_array, "oracle"):
+        return None
+    obj = DotDict()
+    obj.dist_array = distances.dist_array
+    obj.time_array = distances.time_array
+    # opened on first access for cached distances
+    routes = distances.edges_array
+    if not isinstance(routes, RouteStore):
+        # routes as lists of edge IDs (projects of older versions)
+        n = len(distances.dist_array)
+        obj.edges_array = RouteStore(n)
+        for row in routes if routes is not None else [[None] * n] * n:
+            obj.edges_array.add_row(list(row))
+    else:
+        obj.edges_array = routes
+    return obj
+
+
+class ProjectArtifact:
+    """
+    sections of a project on disk, see load_project and save_project
+    - manifest: {"schema": PROJECT_SCHEMA, "sections": {name: entry}}
+      entry: {"kind": "json"|"pickle"|"matrix", "file": name, "digest": sha256}
+    - loaded: {name: objects} as read or written, for the unchanged matrices
+    """
+
+    def __init__(self, path, manifest=None):
+        self.path = path
+        self.manifest = manifest or {"schema": PROJECT_SCHEMA, "sections": {}}
+        self.loaded = {}
+
+    def load_attribute(self, data, att):
+        """
+        read the section of attribute att into data, False if there is none
+        """
+        name = SECTION_OF.get(att)
+        if name is None:
+            return False
+        entry = self.manifest["sections"].get(name)
+        objects = (None,) * len(SECTIONS[name])
+        if entry:
+            filename = os.path.join(self.path, entry["file"])
+            dlog(f"project section {name} from {filename}")
+            if entry["kind"] == "matrix":
+                objects = (open_distances(filename),)
+            else:
+                with open(filename, "rb") as f:
+                    objects = SectionUnpickler(f, data).load()
+        for a, obj in zip(SECTIONS[name], objects):
+            data.__dict__[a] = obj
+        self.loaded[name] = objects
+        return True
+
+    def write_file(self, name, suffix, content):
+        filename = f"{name}.{uuid.uuid4().hex[:12]}{suffix}"
+        tmp = os.path.join(self.path, f".tmp_{filename}")
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, os.path.join(self.path, filename))
+        return filename
+
+    def section_entry(self, data, name):
+        """
+        returns the manifest entry of the section, written if it changed
+        """
+        objects = tuple(data.__dict__.get(att) for att in SECTIONS[name])
+        entry = self.manifest["sections"].get(name)
+        distances = None
+        if name == "distances":
+            if entry and entry["kind"] == "matrix":
+                if objects[0] is self.loaded.get(name, (None,))[0]:
+                    return entry
+            distances = matrix_distances(objects[0])
+        if distances is not None:
+            # matrices: stored as arrays, not pickled
+            filename = f"distances.{uuid.uuid4().hex[:12]}"
+            save_distances(
+                self.path, filename, distances, data.speed, None, data.poi or []
+            )
+            return {"kind": "matrix", "file": filename, "digest": filename}
+        buffer = io.BytesIO()
+        SectionPickler(buffer, references(data, name)).dump(objects)
+        content = buffer.getvalue()
+        digest = hashlib.sha256(content).hexdigest()
+        if entry and entry["digest"] == digest:
+            return entry
+        filename = self.write_file(name, ".pickle", content)
+        return {"kind": "pickle", "file": filename, "digest": digest}
+
+    def save(self, data):
+        """
+        write the changed and the loaded sections of data
+        """
+        # settings not stored as JSON: raised before any file is written
+        config = {
+            att: value
+            for att, value in data.__dict__.items()
+            if att not in SECTION_OF and not att.startswith("_")
+        }
+        content = json.dumps(
+            config, indent=1, sort_keys=True, default=json_value
+        ).encode()
+        digest = hashlib.sha256(content).hexdigest()
+
+        os.makedirs(self.path, exist_ok=True)
+        sections = {}
+        for name, atts in SECTIONS.items():
+            if any(att in data.__dict__ for att in atts):
+                sections[name] = self.section_entry(data, name)
+            elif name in self.manifest["sections"]:
+                # not read: unchanged
+                sections[name] = self.manifest["sections"][name]
+        entry = self.manifest["sections"].get("config")
+        if not entry or entry["digest"] != digest:
+            entry = {
+                "kind": "json",
+                "file": self.write_file("config", ".json", content),
+                "digest": digest,
+            }
+        sections["config"] = entry
+
+        # the files of the previous manifest are kept for runs reading it
+        keep = {e["file"] for e in self.manifest["sections"].values()}
+        self.manifest = {"schema": PROJECT_SCHEMA, "sections": sections}
+        keep |= {e["file"] for e in sections.values()}
+        tmp = os.path.join(self.path, f".tmp_manifest.{uuid.uuid4().hex[:12]}.json")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+        for name, atts in SECTIONS.items():
+            if any(att in data.__dict__ for att in atts):
+                self.loaded[name] = tuple(data.__dict__.get(att) for att in atts)
+        remove_files(
+            self.path,
+            [
+                name
+                for name in os.listdir(self.path)
+                if name not in keep and name != "manifest.json"
+                # ".tmp_": written by a concurrent save
+                and not name.startswith(".")
+            ],
+        )
+
+
+def json_value(value):
+    # NumPy scalars, e.g. the speed from a matrix
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def remove_files(path, names):
+    for name in names:
+        filename = os.path.join(path, name)
+        try:
+            if os.path.isdir(filename):
+                for f in os.listdir(filename):
+                    os.remove(os.path.join(filename, f))
+                os.rmdir(filename)
+            else:
+                os.remove(filename)
+        except OSError as e:
+            dlog(f"project file {filename} not removed: {e}")
+
+
+def read_manifest(path):
+    """
+    returns the manifest of the project artifact, None if there is no valid one
+    """
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("schema") != PROJECT_SCHEMA:
+        elog(f"project {path}: schema {manifest.get('schema')}, expected {PROJECT_SCHEMA}")
+        return None
+    return manifest
+
+
+def load_project(config):
+    """
+    returns the ProjectConfigData of config.project_file, its sections read
+    on first use, config if there is no project
+    a project pickle of older versions is read and written as artifact
+    on the next save
+    """
+    path = artifact_dir(config.project_file)
+    manifest = read_manifest(path) if path else None
+    if manifest is None:
+        data = read_pickle(config.project_file, config) if path else config
+        if data is not config:
+            dlog(f"project pickle {config.project_file}")
+        data._artifact = ProjectArtifact(path)
+        return data
+    entry = manifest["sections"].get("config")
+    data = config.__class__.__new__(config.__class__)
+    # settings added after the project was stored: from config
+    data.__dict__.update(
+        {att: value for att, value in config.__dict__.items() if att not in SECTION_OF}
+    )
+    if entry:
+        with open(os.path.join(path, entry["file"])) as f:
+            data.__dict__.update(json.load(f))
+    data._artifact = ProjectArtifact(path, manifest)
+    dlog(f"project {path}")
+    return data
+
+
+def save_project(project_file, data):
+    """
+    store the project data in the artifact of project_file
+    """
+    path = artifact_dir(project_file)
+    if path is None:
+        elog(f"project not stored, no project file: {project_file}")
+        return
+    artifact = data.__dict__.get("_artifact")
+    if artifact is None or artifact.path != path:
+        # another project: all sections are written
+        for att in SECTION_OF:
+            getattr(data, att)
+        data._artifact = artifact = ProjectArtifact(path, read_manifest(path))
+    try:
+        artifact.save(data)
+    except (OSError, TypeError, ValueError, pickle.PicklingError) as e:
+        elog(f"project not stored in {path}: {e}")
+        return
+    dlog(f"project stored in {path}")
@@ -28,9 +28,58 @@ from pathlib import Path
 from Tools.dotdict import DotDict
 from Net.point_of_interest import Point_of_Interest, PARKING_POI
 from Net.poi_manager import POI_Manager
+from Net.road_graph import road_graph
+
+
+def top_elements(filename, tags):
+    """
+    yields the elements below the root of an XML file with one of the tags
+    the file is parsed as a stream, every element is cleared after use
+    """
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(filename, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            if elem.tag in tags:
+                yield elem
+            elem.clear()
+            # drop the reference of the root to the element
+            root.clear()
+
+
+def poi_then_poly(elements):
+    """
+    yields the attributes of the poi elements, then of the poly elements
+    """
+    polys = []
+    for elem in elements:
+        if elem.tag == "poi":
+            yield elem.attrib
+        else:
+            polys.append(dict(elem.attrib))
+    yield from polys
 
 
 class Edge:
+    __slots__ = (
+        "eid",
+        "type",
+        "lanes",
+        "road",
+        "name",
+        "walk_lane",
+        "vehicle_lane",
+        "from_to",
+        "length",
+        "speed",
+    )
+
     def __init__(self, eid, typ, streetname):
         self.eid = eid
         self.type = typ
@@ -40,6 +89,26 @@ class Edge:
         self.walk_lane = None
         self.vehicle_lane = None
         self.from_to = []
+        self.length = 0.0
+        self.speed = 0.0
+
+    @staticmethod
+    def from_values(eid, typ, lanes, road, name, walk_lane, vehicle_lane, from_to, length, speed):
+        """
+        returns the Edge with the values of __slots__
+        """
+        e = Edge.__new__(Edge)
+        e.eid = eid
+        e.type = typ
+        e.lanes = lanes
+        e.road = road
+        e.name = name
+        e.walk_lane = walk_lane
+        e.vehicle_lane = vehicle_lane
+        e.from_to = from_to
+        e.length = length
+        e.speed = speed
+        return e
 
     def dd(self):
         d = DotDict()
@@ -56,54 +125,79 @@ class SumoReader:
         self.poi_mgr = pm
         self.poiColorDict = {}
         self.edge_dict = {}
-
-    def read_config(self, filename, dbg=False):
-        print(f"SUMO config {filename}")
+        self.net_file = None
+
+    def __getstate__(self):
+        # the edges as columns: pickled and loaded much faster than objects
+        state = dict(self.__dict__)
+        edges = list(self.edge_dict.values())
+        state["edge_dict"] = {
+            slot: [getattr(e, slot) for e in edges] for slot in Edge.__slots__
+        }
+        return state
+
+    def __setstate__(self, state):
+        columns = state.pop("edge_dict")
+        self.__dict__.update(state)
+        edges = map(Edge.from_values, *(columns[slot] for slot in Edge.__slots__))
+        self.edge_dict = dict(zip(columns["eid"], edges))
+
+    def config_files(self, filename):
+        """
+        returns the files read by read_config:
+        (net file, additional files, POI view settings, POI edges or None)
+        """
         parent = os.path.dirname(filename)
         netTree = ET.parse(filename)
         netRoot = netTree.getroot()
         # Assumes that there is only ONE netfile in the config
         netfile = netRoot.findall("*/net-file")[0].attrib.get("value")
         netfilepath = Path(parent).joinpath(netfile)
-        self.read_net(netfilepath, dbg)
 
         addfiles = netRoot.findall("*/additional-files")[0].attrib.get("value")
+        add_arr = [Path(parent).joinpath(f.strip()) for f in addfiles.split(",")]
 
-        add_arr = addfiles.split(",")
-        for filename in add_arr:
-            filepath = Path(parent).joinpath(filename.strip())
+        addViewSettings = Path(parent).joinpath("POI_View_Settings.xml")
+        addilepath = Path(parent).joinpath("POIsEdges.xml")
+        if not os.path.isfile(addilepath):
+            addilepath = None
+        return (netfilepath, add_arr, addViewSettings, addilepath)
+
+    def read_config(self, filename, dbg=False):
+        print(f"SUMO config {filename}")
+        (netfilepath, add_arr, addViewSettings, addilepath) = self.config_files(filename)
+        self.net_file = netfilepath
+        self.read_net(netfilepath, dbg)
+
+        for filepath in add_arr:
             self.read_additional(filepath)
 
         # read POI colors from POI_View_Settings.xml
-        addViewSettings = Path(parent).joinpath("POI_View_Settings.xml")
         self.read_poi_colors(addViewSettings, dbg)
 
         # read the Edges which were assigned to the considered POIs and POLYs
         # this is optional, because if we are using Geo Position (lon,lat), we don't need the POIsEdges.xml file
-        addilepath = Path(parent).joinpath("POIsEdges.xml")
-        if os.path.isfile(addilepath):
+        if addilepath:
             self.read_poi_edges(addilepath, dbg)
 
     def read_net(self, filename, dbg=False):
         print(f"SUMO net {filename}")
-        netTree = ET.parse(filename)
-        netRoot = netTree.getroot()
 
         # test_edges = ["178193953"]
         test_edges = []
 
         from_to = {}
-        connections = netRoot.findall("connection")
-        for connect in connections:
-            from_edge = connect.attrib.get("from")
-            to_edge = connect.attrib.get("to")
-            if from_edge in from_to:
-                from_to[from_edge].append(to_edge)
-            else:
-                from_to[from_edge] = [to_edge]
+        for elem in top_elements(filename, ("edge", "connection")):
+            if elem.tag == "connection":
+                from_edge = elem.attrib.get("from")
+                to_edge = elem.attrib.get("to")
+                if from_edge in from_to:
+                    from_to[from_edge].append(to_edge)
+                else:
+                    from_to[from_edge] = [to_edge]
+                continue
 
-        edges = netRoot.findall("edge")
-        for edge in edges:
+            edge = elem
             edge_id = edge.attrib.get("id")
             edge_type = edge.attrib.get("type")
             street = edge.attrib.get("name")
@@ -131,13 +225,26 @@ class SumoReader:
                         edge_obj.vehicle_lane = lane_id
                 else:
                     edge_obj.vehicle_lane = lane_id
+                if edge_obj.vehicle_lane == lane_id:
+                    edge_obj.length = float(lane.attrib.get("length", 0))
+                    speed = float(lane.attrib.get("speed", 0))
+                    edge_obj.speed = max(edge_obj.speed, speed)
             if edge_obj.vehicle_lane:
                 edge_obj.road = edge_id
 
-            if edge_id in from_to:
-                edge_obj.from_to = from_to[edge_id]
             self.edge_dict[edge_id] = edge_obj
 
+        # the connections follow the edges in the net file
+        for edge_id, to_edges in from_to.items():
+            if edge_id in self.edge_dict:
+                self.edge_dict[edge_id].from_to = to_edges
+
+    def road_graph(self):
+        """
+        returns the graph of the road edges, see Net.road_graph
+        """
+        return road_graph(self.edge_dict)
+
     def has_road(self, eid):
         if eid in self.edge_dict:
             edge_obj: Edge = self.edge_dict[eid]
@@ -148,9 +255,7 @@ class SumoReader:
 
     def read_additional(self, filename, dbg=False):
         print(f"SUMO add {filename}")
-        netTree = ET.parse(filename)
-        netRoot = netTree.getroot()
-        parkingareas = netRoot.findall("parkingArea")
+        parkingareas = top_elements(filename, ("parkingArea",))
         no_road_counter = 0
         road_counter = 0
         for parking in parkingareas:
@@ -205,15 +310,13 @@ class SumoReader:
 
     def read_poi_edges(self, filename, dbg=False):
         print(f"SUMO add {filename}")
-        netTree = ET.parse(filename)
-        netRoot = netTree.getroot()
-        point_of_interest = netRoot.findall("poi") + netRoot.findall("poly")
+        point_of_interest = poi_then_poly(top_elements(filename, ("poi", "poly")))
         no_road_counter = 0
         road_counter = 0
-        for poi in point_of_interest:
-            poi_id = poi.attrib.get("id")
-            edge_id = poi.attrib.get("edge_id")
-            poi_type = poi.attrib.get("type")
+        for attrib in point_of_interest:
+            poi_id = attrib.get("id")
+            edge_id = attrib.get("edge_id")
+            poi_type = attrib.get("type")
             poi_obj = Point_of_Interest(poi_id, edge_id)
             poi_obj.poi_type = poi_type
 
@@ -221,7 +324,7 @@ class SumoReader:
             if poi_type in self.poiColorDict.keys():
                 poi_obj.color = self.poiColorDict[poi_type]
 
-            poi_obj.pos = float(poi.attrib.get("lane_position"))
+            poi_obj.pos = float(attrib.get("lane_position"))
             if poi_obj.pos < 0:
                 elog(f"reset pos at {edge_id} {poi_type} {poi_obj.pos}")
                 poi_obj.pos = 0
@@ -236,7 +339,11 @@ class SumoReader:
                 no_road_counter += 1
         print(f"road poi Road cnt:{road_counter} / No road cnt:{no_road_counter}")
 
-    def clean_roads(self, traci, start_edge, skip_find_route_to_clean_edge):
+    def clean_roads(self, start_edge, skip_find_route_to_clean_edge=False):
+        """
+        keeps the road edges and POIs with routes to and from start_edge
+        skip_find_route_to_clean_edge: keep all road edges
+        """
         filtered = [v for k, v in self.edge_dict.items() if v.vehicle_lane]
 
         roads = DotDict()
@@ -247,26 +354,25 @@ class SumoReader:
         log(f"Cleaning roads ({len(filtered)}). Check if route to 'clean_edge'({start_edge}) exists.")
 
         # fix for #9
+        # valid: routes from and to start_edge, its strongly connected component
+        # (the same as findRoute in both directions for each edge)
+        if skip_find_route_to_clean_edge:
+            component = {edge.eid for edge in filtered}
+        else:
+            graph = self.road_graph()
+            component = set()
+            if start_edge in graph.index:
+                component = set(graph.strong_component(graph.index[start_edge]))
+            else:
+                elog(f"clean_edge {start_edge} is no road")
         for edge in filtered:
-            if skip_find_route_to_clean_edge:
+            if edge.eid in component:
                 valid_edges.append(edge.eid)
                 roads.valid.append(edge.dd())
-                continue
-            else:
-                stage_to = traci.simulation.findRoute(start_edge, edge.eid)
-                stage_from = traci.simulation.findRoute(edge.eid, start_edge)
-                if (
-                    stage_to
-                    and len(stage_to.edges) > 0
-                    and stage_from
-                    and len(stage_from.edges) > 0
-                ):
-                    valid_edges.append(edge.eid)
-                    roads.valid.append(edge.dd())
 
         self.poi_mgr.clean(valid_edges)
         roads.poi = [poi.dd() for poi in self.poi_mgr.poi_arr]
-        parking = [poi for poi in self.poi_mgr.poi_arr if poi.poi_type == PARKING_POI]
+        parking = self.poi_mgr.parking_POI()
 
         log(f"{len(roads.valid)}/{len(filtered)} valid road edges")
         log(f"{len(parking)} valid parking")
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+from Project import net_cache
+from Project.net_cache import CACHE_VERSION, cache_files, load_reader, save_reader
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+net_cache.dlog = quiet
+
+
+class Reader:
+    """
+    SumoReader with the input files only
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.edges = None
+
+    def config_files(self, config_file):
+        net_file = os.path.join(self.path, "net.xml")
+        add_file = os.path.join(self.path, "add.xml")
+        return (net_file, [add_file], None, os.path.join(self.path, "missing.xml"))
+
+
+class TestNetCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+        self.config_file = os.path.join(self.path, "net.sumocfg")
+        for name in ("net.sumocfg", "net.xml", "add.xml"):
+            self.write(name, name)
+        reader = Reader(self.path)
+        reader.edges = {"e1": 1}
+        save_reader(reader, self.config_file, clean_edge="e1")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.path, name), "w") as f:
+            f.write(content)
+
+    def load(self, **params):
+        return load_reader(Reader(self.path), self.config_file, **(params or {"clean_edge": "e1"}))
+
+    def manifest(self):
+        with open(cache_files(self.config_file)[0]) as f:
+            return json.load(f)
+
+    def test_cached(self):
+        self.assertEqual({"e1": 1}, self.load().edges)
+        files = [entry[0] for entry in self.manifest()["files"]]
+        self.assertEqual(["net.sumocfg", "net.xml", "add.xml"], [os.path.basename(f) for f in files])
+
+    def test_other_parameters(self):
+        self.assertIsNone(self.load(clean_edge="e2"))
+
+    def test_changed_file(self):
+        self.write("add.xml", "changed")
+        self.assertIsNone(self.load())
+
+    def test_same_size_changed_content(self):
+        filename = os.path.join(self.path, "net.xml")
+        self.write("net.xml", "NET.xml")
+        os.utime(filename, ns=(0, os.stat(filename).st_mtime_ns + 10**9))
+        self.assertIsNone(self.load())
+
+    def test_touched_file(self):
+        filename = os.path.join(self.path, "net.xml")
+        mtime = os.stat(filename).st_mtime_ns + 10**9
+        os.utime(filename, ns=(mtime, mtime))
+        self.assertIsNotNone(self.load())
+        # the new mtime is stored, the file is not hashed again
+        entry = [e for e in self.manifest()["files"] if e[0] == filename][0]
+        self.assertEqual(mtime, entry[2])
+
+    def test_stale_manifest(self):
+        manifest_file = cache_files(self.config_file)[0]
+        manifest = self.manifest()
+        manifest["version"] = CACHE_VERSION - 1
+        with open(manifest_file, "w") as f:
+            json.dump(manifest, f)
+        self.assertIsNone(self.load())
+        with open(manifest_file, "w") as f:
+            f.write("{")
+        self.assertIsNone(self.load())
+
+    def test_new_input_file(self):
+        self.write("missing.xml", "poi edges")
+        self.assertIsNone(self.load())
+
+    def test_missing_pickle(self):
+        os.remove(cache_files(self.config_file)[1])
+        self.assertIsNone(self.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from Tools.dotdict import DotDict
+from Tools.pickle_io import write_pickle
+from Net.dist_cache import save_distances
+from Net.dist_oracle import DistanceOracle
+from Net.point_of_interest import Point_of_Interest
+from Net.route_store import RouteStore
+from Moving.request import Request
+from Net import dist_cache
+from Project import project_store
+from Project.project_data import ProjectConfigData
+from Project.project_store import (
+    PROJECT_SCHEMA,
+    SECTION_OF,
+    artifact_dir,
+    load_project,
+    save_project,
+)
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+dist_cache.dlog = project_store.dlog = project_store.elog = quiet
+
+N = 20
+
+
+def project(path):
+    data = ProjectConfigData("net.sumocfg", os.path.join(path, "project.pickle"), no_of_poi=N)
+    data.poi = []
+    for k in range(N):
+        p = Point_of_Interest(f"p{k}", f"e{k}")
+        p.idx = k
+        p.pos = float(k)
+        p.poi_type = "parking" if k % 5 == 0 else "other"
+        data.poi.append(p)
+    data.parking = [p for p in data.poi if p.poi_type == "parking"]
+    data.requests = [
+        Request(data.poi[k], data.poi[k + 1], submit_time=k, calculated_distance=1.0, calculated_time=2.0)
+        for k in range(N - 1)
+    ]
+    routes = RouteStore(N)
+    for i in range(N):
+        routes.add_row([[f"e{i}", f"e{j}"] if i != j else 0 for j in range(N)])
+    rnd = np.random.default_rng(1)
+    data.distances = DotDict(
+        dist_array=rnd.random((N, N)), time_array=rnd.random((N, N)), edges_array=routes
+    )
+    data.speed = np.float64(8.3)
+    data.routes = [[data.requests[0], data.requests[5]]]
+    return data
+
+
+def files(data):
+    return set(os.listdir(artifact_dir(data.project_file)))
+
+
+class TestProjectStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = project(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, **kwargs):
+        return load_project(ProjectConfigData("net.sumocfg", self.data.project_file, **kwargs))
+
+    def assert_distances(self, expected, distances):
+        np.testing.assert_array_equal(expected.dist_array, distances.dist_array)
+        np.testing.assert_array_equal(expected.time_array, distances.time_array)
+        for i in range(N):
+            for j in range(N):
+                self.assertEqual(expected.edges_array[i][j], distances.edges_array[i][j])
+
+    def test_round_trip(self):
+        save_project(self.data.project_file, self.data)
+        data = self.load()
+        # read on first use
+        self.assertFalse(any(att in data.__dict__ for att in SECTION_OF))
+        self.assertEqual(N, data.no_of_poi)
+        self.assertEqual(8.3, data.speed)
+        self.assertIs(data.poi[3], data.requests[3].from_poi)
+        self.assertIs(data.poi[5], data.parking[1])
+        self.assertIs(data.requests[5], data.routes[0][1])
+        self.assertNotIn("distances", data.__dict__)
+        self.assert_distances(self.data.distances, data.distances)
+        self.assertIsNone(data.edge_coords)
+        # pickled with all sections
+        copy = pickle.loads(pickle.dumps(self.load()))
+        self.assertNotIn("_artifact", copy.__dict__)
+        self.assertIs(copy.poi[3], copy.requests[3].from_poi)
+
+    def test_changed_sections_only(self):
+        save_project(self.data.project_file, self.data)
+        before = files(self.data)
+        data = self.load()
+        data.requests
+        data.distances
+        save_project(data.project_file, data)
+        self.assertEqual(before, files(self.data))
+        data.routes = [[data.requests[1]]]
+        save_project(data.project_file, data)
+        added = files(self.data) - before
+        self.assertEqual(["routes"], [name.split(".")[0] for name in added])
+        data = self.load()
+        self.assertIs(data.requests[1], data.routes[0][0])
+
+    def test_cached_distances(self):
+        cache_dir = os.path.join(self.tmp.name, "dist_cache")
+        cached = save_distances(cache_dir, "key", self.data.distances, 8.3, None, self.data.poi)
+        self.data.distances = cached
+        save_project(self.data.project_file, self.data)
+        # stored in the project, not as a reference to the cache
+        for name in os.listdir(cache_dir):
+            os.rename(os.path.join(cache_dir, name), os.path.join(self.tmp.name, name))
+        self.assert_distances(project(self.tmp.name).distances, self.load().distances)
+
+    def test_distances_of_older_projects(self):
+        expected = self.data.distances
+        self.data.distances = DotDict(
+            dist_array=expected.dist_array.tolist(),
+            time_array=expected.time_array.tolist(),
+            edges_array=[[expected.edges_array[i][j] for j in range(N)] for i in range(N)],
+        )
+        save_project(self.data.project_file, self.data)
+        manifest = project_store.read_manifest(artifact_dir(self.data.project_file))
+        self.assertEqual("matrix", manifest["sections"]["distances"]["kind"])
+        self.assert_distances(expected, self.load().distances)
+
+    def test_oracle(self):
+        oracle = DistanceOracle(N)
+        oracle.pairs[5] = (1.0, 2.0, ["e0", "e5"])
+        self.data.distances = oracle
+        save_project(self.data.project_file, self.data)
+        distances = self.load().distances
+        self.assertIsInstance(distances, DistanceOracle)
+        self.assertEqual(list(oracle.pairs.items()), list(distances.pairs.items()))
+
+    def test_config_not_stored(self):
+        save_project(self.data.project_file, self.data)
+        before = files(self.data)
+        data = self.load()
+        data.requests = data.requests[:3]
+        data.delay = {1, 2}
+        save_project(data.project_file, data)
+        # no section written for a project that is not stored
+        self.assertEqual(before, files(self.data))
+        self.assertEqual(N - 1, len(self.load().requests))
+
+    def test_stale_manifest(self):
+        save_project(self.data.project_file, self.data)
+        path = os.path.join(artifact_dir(self.data.project_file), "manifest.json")
+        with open(path) as f:
+            manifest = json.load(f)
+        manifest["schema"] = PROJECT_SCHEMA + 1
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+        # not read: the configuration of the run
+        data = self.load(no_of_poi=3)
+        self.assertEqual(3, data.no_of_poi)
+        self.assertIsNone(data.requests)
+
+    def test_project_pickle_of_older_versions(self):
+        write_pickle(self.data.project_file, self.data)
+        data = self.load()
+        self.assertEqual(N - 1, len(data.requests))
+        save_project(data.project_file, data)
+        os.remove(self.data.project_file)
+        data = self.load()
+        self.assertIs(data.poi[0], data.requests[0].from_poi)
+
+    def test_no_project_file(self):
+        config = ProjectConfigData("net.sumocfg", self.tmp.name)
+        self.assertIs(config, load_project(config))
+        save_project(self.tmp.name, config)
+        self.assertEqual([], [n for n in os.listdir(self.tmp.name) if n.endswith(".project")])
+
+
+if __name__ == '__main__':
+    unittest.main()
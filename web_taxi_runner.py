@@ -28,10 +28,6 @@ from Tools.logger import log, elog
 from Tools.XMLogger import write_log
 from Tools.json_io import write_JSON
 
-import sys
-
-sys.setrecursionlimit(1500)
-
 MINUTE = 60
 
 dir = os.path.dirname(__file__)
@@ -119,7 +115,7 @@ if __name__ == "__main__":
         "--project",
         action="store",
         dest="project_file",
-        help="project/pickle-file to load",
+        help="project file to load, stored in the directory <name>.project (older pickle files are read)",
         default="/",
     )
     parser.add_option(
@@ -156,6 +152,48 @@ if __name__ == "__main__":
         help="create dist matrix for shared strategy",
         default=False
     )
+    parser.add_option(
+        "--dist_engine",
+        action="store",
+        dest="dist_engine",
+        help="dist matrix from SUMO routing (traci) or from the net file (net); default traci",
+        default="traci",
+    )
+    parser.add_option(
+        "--dist_processes",
+        action="store",
+        dest="dist_processes",
+        help="processes (net) or SUMO instances (traci) for the dist matrix, 0 for all CPUs; default 1",
+        default="1",
+    )
+    parser.add_option(
+        "--dist_cache",
+        action="store",
+        dest="dist_cache",
+        help="directory of the dist matrix cache, relative to the SUMO config, e.g. dist_cache; default empty = no cache",
+        default="",
+    )
+    parser.add_option(
+        "--dist_lazy",
+        action="store",
+        dest="dist_lazy",
+        help="calculate distances on first use, keeping up to this number of pairs, not with the min_fleet planner; default 0 = full matrix",
+        default="0",
+    )
+    parser.add_option(
+        "--dispatch_router",
+        action="store",
+        dest="dispatch_router",
+        help="landmarks of the router for dispatching in look_ahead and sup_learn; default 0 = TraCI routing",
+        default="0",
+    )
+    parser.add_option(
+        "--generic_poi_snap",
+        action="store",
+        dest="generic_poi_snap",
+        help="requests without POI share one generic POI per edge and position rounded to this (m); default 0 = same position",
+        default="0",
+    )
     parser.add_option(
         "--edge_coords_file",
         action="store",
@@ -181,9 +219,37 @@ if __name__ == "__main__":
         "--skip_find_route_to_clean_edge",
         action="store",
         dest="skip_find_route_to_clean_edge",
-        help="skip find route to clean edge (takes a lot of time and can be done before simulation)",
+        help="skip the check of routes to and from the clean edge (keep all road edges)",
         default=False
     )
+    parser.add_option(
+        "--shared_planner",
+        action="store",
+        dest="shared_planner",
+        help="planner for the shared strategy: routes (one optimal route per vehicle) or min_fleet (minimum number of vehicles)",
+        default="routes",
+    )
+    parser.add_option(
+        "--shared_window",
+        action="store",
+        dest="shared_window",
+        help="plan the shared routes while running in windows of secs (submit time); default 0 plans all routes at the beginning",
+        default="0",
+    )
+    parser.add_option(
+        "--max_riders",
+        action="store",
+        dest="max_riders",
+        help="largest number of shared requests in one trip; default 2",
+        default="2",
+    )
+    parser.add_option(
+        "--planning_processes",
+        action="store",
+        dest="planning_processes",
+        help="plan all shared parameter combinations before simulating in that many processes; default 0 plans each combination before its simulation",
+        default="0",
+    )
 
     options, args = parser.parse_args()
     config: ProjectConfigData = project_config_from_options(options)
@@ -239,6 +305,14 @@ if __name__ == "__main__":
                 )
         # shared strategy
         else:
+            # plan all combinations offline without SUMO
+            # (not for rolling windows or lazy distances)
+            plans = {}
+            processes = int(options.planning_processes)
+            if processes and not int(config.shared_window) and not int(config.dist_lazy):
+                plans = p.plan_shared_sweep(
+                    REALISTIC_TIMES, LATENESS_FACTORS, processes=processes
+                )
             for realistic_time in REALISTIC_TIMES:
                 for lateness_factor in LATENESS_FACTORS:
                     p.set_max_delay(
@@ -246,7 +320,12 @@ if __name__ == "__main__":
                         realistic_time=realistic_time,
                         late_time=lateness_factor,
                     )
-                    p.calc_shared(realistic_time=realistic_time)
+                    if plans:
+                        p.set_shared_routes(
+                            realistic_time, plans[(realistic_time, lateness_factor)]
+                        )
+                    else:
+                        p.calc_shared(realistic_time=realistic_time)
                     elog("#####################################################")
                     elog(f'Starting "{strategy}"')
                     elog(